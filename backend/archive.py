@@ -0,0 +1,99 @@
+"""
+Order archival: move finished orders out of the hot tables.
+
+Completed and Cancelled orders older than ARCHIVE_AFTER_DAYS are copied to
+orders_archive / order_items_archive and deleted from orders / order_items,
+ARCHIVE_BATCH_SIZE orders per transaction, so list, statistics and kitchen
+queries only touch recent history and writers are never blocked for long.
+
+Nothing else changes for the archived orders: item_daily_sales keeps their
+sales (rollups.rebuild reads the archive too), order_status_counts keeps
+counting them, and tracking codes still resolve (tracking_cache falls back
+to orders_archive). Run it from cron or by hand:
+
+    python -m backend.archive --days 90
+"""
+import argparse
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import delete, func, insert, literal, select
+from .database import SessionLocal, engine as default_engine
+from . import models, versions
+
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "5000"))
+FINISHED_STATUSES = ("Completed", "Cancelled")
+
+ORDER_COLUMNS = ["id", "tracking_code", "user_details", "total_amount", "order_status", "created_at"]
+ITEM_COLUMNS = ["id", "order_id", "item_id", "quantity", "unit_price"]
+
+
+def archivable(cutoff: datetime, limit: int):
+    """Oldest finished orders created before cutoff (uses the status/created_at index)."""
+    return (
+        select(models.Order.id)
+        .where(models.Order.order_status.in_(FINISHED_STATUSES), models.Order.created_at < cutoff)
+        .order_by(models.Order.order_status, models.Order.created_at, models.Order.id)
+        .limit(limit)
+    )
+
+
+def archive_batch(db, cutoff: datetime, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """Move up to batch_size orders in one transaction; returns how many moved."""
+    ids = list(db.scalars(archivable(cutoff, batch_size)))
+    if not ids:
+        return 0
+    archived_at = datetime.utcnow()
+    order, item = models.Order.__table__, models.OrderItem.__table__
+    db.execute(insert(models.OrderArchive).from_select(
+        ORDER_COLUMNS + ["archived_at"],
+        select(*[order.c[name] for name in ORDER_COLUMNS], literal(archived_at)).where(order.c.id.in_(ids)),
+    ))
+    db.execute(insert(models.OrderItemArchive).from_select(
+        ITEM_COLUMNS,
+        select(*[item.c[name] for name in ITEM_COLUMNS]).where(item.c.order_id.in_(ids)),
+    ))
+    db.execute(delete(models.OrderItem).where(models.OrderItem.order_id.in_(ids)))
+    db.execute(delete(models.Order).where(models.Order.id.in_(ids)))
+    versions.bump_version(db, versions.ORDERS)
+    db.commit()
+    return len(ids)
+
+
+def archive_orders(engine=default_engine, older_than_days: int = ARCHIVE_AFTER_DAYS,
+                   batch_size: int = ARCHIVE_BATCH_SIZE, max_batches=None) -> int:
+    """Archive every eligible order, batch by batch; returns the number moved."""
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    moved = batches = 0
+    with SessionLocal(bind=engine) as db:
+        while max_batches is None or batches < max_batches:
+            count = archive_batch(db, cutoff, batch_size)
+            if not count:
+                break
+            moved += count
+            batches += 1
+    return moved
+
+
+def count_archivable(engine=default_engine, older_than_days: int = ARCHIVE_AFTER_DAYS) -> int:
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    with SessionLocal(bind=engine) as db:
+        return db.scalar(
+            select(func.count()).select_from(models.Order)
+            .where(models.Order.order_status.in_(FINISHED_STATUSES), models.Order.created_at < cutoff)
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move old Completed/Cancelled orders to the archive tables.")
+    parser.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS, help="archive orders older than this")
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE, help="orders per transaction")
+    parser.add_argument("--max-batches", type=int, help="stop after this many batches")
+    parser.add_argument("--dry-run", action="store_true", help="only count the orders that would move")
+    args = parser.parse_args()
+
+    if args.dry_run:
+        print(f"{count_archivable(older_than_days=args.days)} orders older than {args.days} days would be archived.")
+    else:
+        moved = archive_orders(older_than_days=args.days, batch_size=args.batch_size, max_batches=args.max_batches)
+        print(f"Archived {moved} orders older than {args.days} days.")
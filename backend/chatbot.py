@@ -1,15 +1,14 @@
-print("🔥 NEW CHATBOT FILE LOADED")
-
 from sqlalchemy.orm import Session
 import re
 import os
+import asyncio
 import logging
+import time
 from pathlib import Path
 from dotenv import load_dotenv
-from rapidfuzz import fuzz
-import google.generativeai as genai
 
-from . import crud, schemas
+from . import crud, schemas, menu_cache, response_cache, llm_providers, prompts, intents, order_parser, metrics, tracking_cache, conversation_store as conversation_stores
+from .database import SessionLocal
 
 # ------------------ LOGGING ------------------
 logging.basicConfig(level=logging.INFO)
@@ -18,158 +17,324 @@ logger = logging.getLogger(__name__)
 # ------------------ ENV ------------------
 env_path = Path(__file__).parent / ".env"
 if not env_path.exists():
-    logger.warning(f".env file not found at {env_path}")
+    logger.warning(".env file not found at %s", env_path)
 load_dotenv(dotenv_path=env_path)
 
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-if not GOOGLE_API_KEY:
-    raise RuntimeError("❌ GOOGLE_API_KEY missing in .env file")
+# ------------------ MEMORY ------------------
+conversation_store = conversation_stores.from_env()
+
+# ------------------ CONCURRENCY ------------------
+# Max LLM calls in flight per worker, how long a chat may wait for a free
+# slot, and the hard timeout for a single generate call.
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "2"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "20"))
+
+llm_semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+
+# Per-stage chat timings (chat_stage_duration_seconds on /metrics). The LLM
+# call itself is timed per provider in llm_providers.
+stage = metrics.chat_stage_duration.time
+
+
+class LLMOverloaded(Exception):
+    """Raised when no LLM slot frees up within LLM_QUEUE_TIMEOUT_SECONDS."""
+
+
+# ------------------ LLM CALL ------------------
+# The backend (Gemini, a local CPU model or the offline stub) comes from
+# llm_providers; these wrappers add the concurrency limit, timeouts and
+# per-provider latency/token accounting.
+UNAVAILABLE_REPLY = "⚠️ AI model currently unavailable."
+TIMEOUT_REPLY = "⚠️ AI is taking too long to respond. Please try again."
+
+
+def build_prompt(system_prompt: str, user_message: str) -> str:
+    return f"{system_prompt}\n\nUser: {user_message}"
 
-# ------------------ GEMINI CONFIG ------------------
-genai.configure(api_key=GOOGLE_API_KEY)
 
-def get_available_model(preferred_model="gemini-1.5"):
-    """Tries preferred model, falls back to first available generative model."""
+def query_llm(system_prompt: str, user_message: str):
+    """(reply, ok); ok is False when reply is an error message instead of an answer."""
+    provider = llm_providers.select(user_message)
+    if provider is None:
+        return UNAVAILABLE_REPLY, False
+
+    start = time.perf_counter()
     try:
-        # Try preferred model first
-        model = genai.GenerativeModel(preferred_model)
-        logger.info(f"Using preferred model: {preferred_model}")
-        return model
+        completion = provider.generate(build_prompt(system_prompt, user_message), LLM_TIMEOUT_SECONDS)
     except Exception as e:
-        logger.warning(f"Preferred model not available: {e}")
-        # List all available models
-        available_models = genai.list_models()
-        for m in available_models:
-            if "generateContent" in m.available_methods:
-                logger.info(f"Using fallback model: {m.name}")
-                return genai.GenerativeModel(m.name)
-        raise RuntimeError("❌ No available generative model found.")
+        provider.record(time.perf_counter() - start, outcome="error")
+        logger.error("%s LLM Error: %s", provider.name, e)
+        return f"⚠️ AI is temporarily unavailable. ({e})", False
+    provider.record(time.perf_counter() - start, completion.prompt_tokens, completion.completion_tokens)
+    return completion.text, True
 
-model = get_available_model()  # Automatically chooses working model
 
-# ------------------ MEMORY ------------------
-conversation_history = {}
+async def acquire_llm_slot():
+    try:
+        with stage("llm_queue"):
+            await asyncio.wait_for(llm_semaphore.acquire(), LLM_QUEUE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise LLMOverloaded(
+            f"{LLM_MAX_CONCURRENCY} LLM calls already in flight"
+        ) from None
 
-# ------------------ LLM CALL ------------------
-def query_llm(system_prompt: str, user_message: str) -> str:
-    if not model:
-        return "⚠️ AI model currently unavailable."
 
+async def query_llm_async(system_prompt: str, user_message: str):
+    """Non-blocking query_llm: waits for a free slot, then awaits the provider."""
+    # First use may load a client or model weights; keep that off the loop.
+    provider = await asyncio.to_thread(llm_providers.select, user_message)
+    if provider is None:
+        return UNAVAILABLE_REPLY, False
+
+    await acquire_llm_slot()
+    start = time.perf_counter()
     try:
-        prompt = f"{system_prompt}\n\nUser: {user_message}"
-        response = model.generate_content(prompt)
-        logger.debug(f"Raw Gemini response: {response}")
+        completion = await asyncio.wait_for(
+            provider.generate_async(build_prompt(system_prompt, user_message), LLM_TIMEOUT_SECONDS),
+            LLM_TIMEOUT_SECONDS,
+        )
+        provider.record(time.perf_counter() - start, completion.prompt_tokens, completion.completion_tokens)
+        return completion.text, True
+
+    except asyncio.TimeoutError:
+        provider.record(time.perf_counter() - start, outcome="timeout")
+        logger.error("%s LLM timed out after %ss", provider.name, LLM_TIMEOUT_SECONDS)
+        return TIMEOUT_REPLY, False
+    except Exception as e:
+        provider.record(time.perf_counter() - start, outcome="error")
+        logger.error("%s LLM Error: %s", provider.name, e)
+        return f"⚠️ AI is temporarily unavailable. ({e})", False
+    finally:
+        llm_semaphore.release()
 
-        if hasattr(response, "text") and response.text:
-            return response.text.strip()
-        elif hasattr(response, "candidates") and len(response.candidates) > 0:
-            part = response.candidates[0].content.parts
-            if part and len(part) > 0:
-                return part[0].text.strip()
 
-        return "⚠️ AI is temporarily unavailable. (Empty response)"
+async def stream_llm(system_prompt: str, user_message: str, status: dict):
+    """Yield reply chunks from the provider as they arrive.
 
+    Sets status["ok"] once the stream ends: False when the provider was
+    unavailable, failed or timed out, in which case the last chunk is an
+    error message (possibly after part of a reply).
+    """
+    provider = await asyncio.to_thread(llm_providers.select, user_message)
+    if provider is None:
+        status["ok"] = False
+        yield UNAVAILABLE_REPLY
+        return
+
+    await acquire_llm_slot()
+    prompt = build_prompt(system_prompt, user_message)
+    parts = []
+    start = time.perf_counter()
+    outcome = "ok"
+    try:
+        chunks = provider.stream(prompt, LLM_TIMEOUT_SECONDS).__aiter__()
+        while True:
+            try:
+                chunk = await asyncio.wait_for(chunks.__anext__(), LLM_TIMEOUT_SECONDS)
+            except StopAsyncIteration:
+                break
+            parts.append(chunk)
+            yield chunk
+
+    except asyncio.TimeoutError:
+        outcome = "timeout"
+        logger.error("%s LLM stream timed out after %ss", provider.name, LLM_TIMEOUT_SECONDS)
+        yield TIMEOUT_REPLY
     except Exception as e:
-        logger.error(f"Gemini Error: {e}")
-        return f"⚠️ AI is temporarily unavailable. ({e})"
-
-# ------------------ FUZZY MATCH ------------------
-def find_menu_items(message: str, menu_items, threshold=70):
-    results = []
-    msg = message.lower()
-    for item in menu_items:
-        score = fuzz.partial_ratio(item.item.lower(), msg)
-        if score >= threshold:
-            results.append(item)
-    return results
+        outcome = "error"
+        logger.error("%s LLM Error: %s", provider.name, e)
+        yield f"⚠️ AI is temporarily unavailable. ({e})"
+    finally:
+        status["ok"] = outcome == "ok"
+        llm_semaphore.release()
+        # Streams don't report usage; count tokens from the text.
+        provider.record(
+            time.perf_counter() - start,
+            llm_providers.estimate_tokens(prompt),
+            llm_providers.estimate_tokens("".join(parts)),
+            outcome,
+        )
 
 # ------------------ MAIN CHAT HANDLER ------------------
-def process_chat_message(
-    message: str,
-    db: Session,
-    session_id: str = "default"
-):
-    try:
-        msg_lower = message.lower()
-        menu_items = crud.get_menu(db)
-
-        # ---------- ORDER INTENT ----------
-        order_keywords = ["order", "buy", "purchase", "give me", "i'll have"]
-        is_order_intent = any(k in msg_lower for k in order_keywords)
-        matched_items = find_menu_items(message, menu_items)
-
-        if is_order_intent and matched_items:
-            item = matched_items[0]
-            qty = 1
-            qty_match = re.search(r"(\d+)", msg_lower)
-            if qty_match:
-                qty = int(qty_match.group(1))
-
-            order_data = schemas.OrderCreate(
-                user_details="Chat Customer",
-                items=[schemas.OrderItemCreate(item_id=item.id, quantity=qty)]
-            )
-            order = crud.create_order(db, order_data)
+def place_order(message: str, db: Session, snapshot):
+    with stage("fuzzy_match"):
+        parsed = order_parser.parse_order(message, snapshot.index)
+    if parsed.questions:
+        return "🤔 **Before I place your order:**\n\n" + "\n".join(f"• {q}" for q in parsed.questions)
+    lines = parsed.lines
+    if not lines:
+        return None
 
-            return (
-                f"✅ **Order Placed!**\n\n"
-                f"🍽 Item: {item.item}\n"
-                f"🔢 Quantity: {qty}\n"
-                f"💰 Total: ${order.total_amount:.2f}\n\n"
-                f"📦 Tracking Code: **{order.tracking_code}**"
-            )
+    order_data = schemas.OrderCreate(
+        user_details="Chat Customer",
+        items=[schemas.OrderItemCreate(item_id=item.id, quantity=qty) for item, qty in lines]
+    )
+    with stage("db_write"):
+        order = crud.create_order(db, order_data)
+
+    items_text = "\n".join(f"🍽 {qty} × {item.item}" for item, qty in lines)
+    return (
+        f"✅ **Order Placed!**\n\n"
+        f"{items_text}\n"
+        f"💰 Total: ${order.total_amount:.2f}\n\n"
+        f"📦 Tracking Code: **{order.tracking_code}**"
+    )
 
-        # ---------- TRACK ORDER ----------
-        if "track" in msg_lower:
-            code_match = re.search(r"\b[A-Z0-9]{6}\b", message.upper())
-            if not code_match:
-                return "📦 Please provide your **6-digit tracking code**."
-            order = crud.get_order_by_tracking_code(db, code_match.group())
-            if not order:
-                return "❌ Order not found."
+
+def track_order(message: str, db: Session):
+    # Codes are 6 characters of A-Z/0-9, so plain words like "STATUS" also
+    # fit; try tokens containing a digit first.
+    codes = re.findall(r"\b[A-Z0-9]{6}\b", message.upper())
+    if not codes:
+        return "📦 Please provide your **6-digit tracking code**."
+    codes.sort(key=lambda code: not any(c.isdigit() for c in code))
+    for code in codes:
+        with stage("db_read"):
+            order = tracking_cache.get_status(db, code)
+        if order:
             return (
                 f"📦 **Order Status**\n\n"
                 f"Status: **{order.order_status}**\n"
                 f"Total: ${order.total_amount:.2f}"
             )
+    return "❌ Order not found."
 
-        # ---------- AI MODE ----------
-        if session_id not in conversation_history:
-            conversation_history[session_id] = []
 
-        conversation_history[session_id] = conversation_history[session_id][-6:]
-        history_text = "\n".join(
-            [f"{r}: {t}" for r, t in conversation_history[session_id]]
-        )
+def handle_fast_paths(message: str, db: Session, snapshot):
+    """Answer routed intents locally, best first; None means ask the LLM."""
+    with stage("intent"):
+        detected = intents.detect(message)
+    for intent, confidence in detected:
+        if intent == "order":
+            reply = place_order(message, db, snapshot)
+        elif intent == "track":
+            reply = track_order(message, db)
+        else:
+            with stage("local_answer"):
+                reply = intents.answer(intent, message, snapshot)
+        if reply is not None:
+            logger.debug("Intent %s (%.2f) answered locally", intent, confidence)
+            intents.record_answer(intent)
+            return reply
+
+    return None
+
+
+def remember_turn(session_id: str, message: str, reply: str):
+    with stage("history_write"):
+        conversation_store.append_turn(session_id, message, reply)
+
 
-        restaurant = crud.get_restaurant_info(db)
-        system_prompt = f"""
-You are a restaurant AI assistant.
+def plan_chat(message: str, db: Session, session_id: str):
+    """Everything in a chat turn that happens before the LLM call.
 
-Restaurant Name: {restaurant.name if restaurant else "Fast Food"}
-Owner: {restaurant.owner if restaurant else "Ameer Gul"}
-Phone: {restaurant.phone if restaurant else "03151095812"}
-Address: {restaurant.address if restaurant else "Karachi"}
+    Returns (reply, system_prompt, cache_key). reply is set when a fast path
+    or the response cache answered; otherwise system_prompt is ready for
+    the LLM and cache_key (None when not cacheable) is where to store its
+    answer via finish_turn.
+    """
+    with stage("menu_load"):
+        snapshot = menu_cache.get_snapshot(db)
+    reply = handle_fast_paths(message, db, snapshot)
+    if reply is not None:
+        return reply, None, None
 
-MENU:
-{[item.item + " ($" + str(item.price) + ")" for item in menu_items]}
+    # ---------- AI MODE ----------
+    with stage("history_read"):
+        history = conversation_store.get_history(session_id)
+    with stage("response_cache"):
+        cache_key = response_cache.make_key(message, snapshot.version, history)
+        cached = response_cache.get(cache_key)
+    if cached is not None:
+        remember_turn(session_id, message, cached)
+        return cached, None, None
 
-RULES:
-- Reply in SAME language as user (English / Urdu / Roman Urdu)
-- Be friendly
-- Do NOT place order unless user clearly wants to buy
-- Use emojis 🍕🍔
+    with stage("prompt_build"):
+        system_prompt = prompts.build_system_prompt(snapshot, message, history)
+    return None, system_prompt, cache_key
 
-Conversation:
-{history_text}
-"""
 
-        ai_reply = query_llm(system_prompt, message)
-        conversation_history[session_id].append(("User", message))
-        conversation_history[session_id].append(("Assistant", ai_reply))
+def finish_turn(session_id: str, message: str, ai_reply: str, cache_key, ok: bool):
+    """Store an LLM reply in the response cache and the history; failed calls are not stored."""
+    response_cache.put(cache_key, ai_reply, ok)
+    if ok:
+        remember_turn(session_id, message, ai_reply)
+
+
+def process_chat_message(
+    message: str,
+    db: Session,
+    session_id: str = "default"
+):
+    try:
+        reply, system_prompt, cache_key = plan_chat(message, db, session_id)
+        if reply is not None:
+            return reply
+
+        ai_reply, ok = query_llm(system_prompt, message)
+        finish_turn(session_id, message, ai_reply, cache_key, ok)
 
         return ai_reply
 
     except Exception as e:
-        logger.error(f"Chat Error: {e}")
+        logger.error("Chat Error: %s", e)
         return f"⚠️ Something went wrong. ({e})"
+
+
+def prepare_chat(message: str, session_id: str):
+    """plan_chat in a worker thread with its own session."""
+    db = SessionLocal()
+    try:
+        return plan_chat(message, db, session_id)
+    finally:
+        db.close()
+
+
+async def process_chat_message_async(message: str, session_id: str = "default"):
+    """Event-loop friendly process_chat_message used by the /chat/ endpoint.
+
+    SQLite work happens off the loop in prepare_chat and finish_turn
+    (the sqlite conversation store writes there); the Gemini call is
+    awaited under llm_semaphore. LLMOverloaded is re-raised so the endpoint
+    can answer 503 instead of queueing indefinitely. Returns (reply, ok),
+    ok being false for error placeholders, as for finish_turn.
+    """
+    try:
+        reply, system_prompt, cache_key = await asyncio.to_thread(prepare_chat, message, session_id)
+        if reply is not None:
+            return reply, True
+
+        ai_reply, ok = await query_llm_async(system_prompt, message)
+        await asyncio.to_thread(finish_turn, session_id, message, ai_reply, cache_key, ok)
+
+        return ai_reply, ok
+
+    except LLMOverloaded:
+        raise
+    except Exception as e:
+        logger.error("Chat Error: %s", e)
+        return f"⚠️ Something went wrong. ({e})", False
+
+
+async def stream_chat_message(message: str, session_id: str = "default", status=None):
+    """Streaming process_chat_message_async: yields the reply in chunks.
+
+    Fast paths and cached replies answer in a single chunk. AI mode forwards
+    Gemini chunks as they arrive and stores the full reply in the
+    conversation history once the stream has finished; a stream that
+    failed part way is not stored. status, if given, gets "ok" as in
+    stream_llm.
+    """
+    status = {} if status is None else status
+    reply, system_prompt, cache_key = await asyncio.to_thread(prepare_chat, message, session_id)
+    if reply is not None:
+        status["ok"] = True
+        yield reply
+        return
+
+    parts = []
+    async for chunk in stream_llm(system_prompt, message, status):
+        parts.append(chunk)
+        yield chunk
+    await asyncio.to_thread(finish_turn, session_id, message, "".join(parts).strip(), cache_key, status["ok"])
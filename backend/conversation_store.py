@@ -0,0 +1,189 @@
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from .ttl_cache import TTLCache
+
+# Conversation history for the chatbot, keyed by session_id.
+#
+# Two backends share one interface:
+#   memory - per-process LRU + TTL cache with a max-sessions cap and a byte
+#            budget (default; history is lost when a request lands on
+#            another worker)
+#   sqlite - a WAL-mode SQLite file shared by every worker on the host
+# Select one with CONVERSATION_STORE=memory|sqlite.
+
+# Upper bound on stored history; how much of it reaches the LLM is decided
+# by the prompt token budget (see prompts.py).
+MAX_TURNS = int(os.getenv("CONVERSATION_MAX_TURNS", "20"))
+MAX_SESSIONS = int(os.getenv("CONVERSATION_MAX_SESSIONS", "10000"))
+TTL_SECONDS = float(os.getenv("CONVERSATION_TTL_SECONDS", "3600"))
+MAX_BYTES = int(os.getenv("CONVERSATION_MAX_BYTES", str(64 * 1024 * 1024)))
+SQLITE_PATH = os.getenv("CONVERSATION_DB_PATH", "./conversations.db")
+
+
+def history_size(turns) -> int:
+    """Approximate bytes held by a session's history."""
+    return sum(len(role) + len(text.encode("utf-8")) for role, text in turns)
+
+
+class ConversationStore(ABC):
+    """Interface for conversation history backends.
+
+    History is a list of (role, text) tuples, oldest first, capped at
+    max_turns entries. append_turn may be called from several threads.
+    """
+
+    @abstractmethod
+    def get_history(self, session_id: str):
+        ...
+
+    @abstractmethod
+    def append_turn(self, session_id: str, user_message: str, reply: str):
+        ...
+
+    @abstractmethod
+    def get_stats(self):
+        ...
+
+
+class InMemoryConversationStore(ConversationStore):
+    def __init__(self, max_turns=MAX_TURNS, max_sessions=MAX_SESSIONS,
+                 ttl_seconds=TTL_SECONDS, max_bytes=MAX_BYTES):
+        self.max_turns = max_turns
+        self.sessions = TTLCache(max_sessions, ttl_seconds, max_bytes, sizeof=history_size)
+        self._lock = threading.Lock()
+
+    def get_history(self, session_id: str):
+        return list(self.sessions.get(session_id, ()))
+
+    def append_turn(self, session_id: str, user_message: str, reply: str):
+        # Stored as immutable tuples so readers never see a half-applied turn;
+        # the lock keeps concurrent turns of a session from overwriting each other.
+        with self._lock:
+            turns = self.sessions.get(session_id, ())
+            turns = (turns + (("User", user_message), ("Assistant", reply)))[-self.max_turns:]
+            self.sessions.set(session_id, turns)
+
+    def get_stats(self):
+        stats = self.sessions.get_stats()
+        return {
+            "backend": "memory",
+            "sessions": stats["entries"],
+            "bytes": stats["bytes"],
+            "evicted_lru": stats["evicted_lru"],
+            "evicted_ttl": stats["evicted_ttl"],
+            "evicted_memory": stats["evicted_memory"],
+        }
+
+
+class SQLiteConversationStore(ConversationStore):
+    """History in a WAL-mode SQLite file so all workers see the same turns.
+
+    Idle sessions and sessions beyond max_sessions are purged every
+    PURGE_EVERY appends rather than on each request.
+    """
+
+    PURGE_EVERY = 200
+
+    def __init__(self, path=SQLITE_PATH, max_turns=MAX_TURNS,
+                 max_sessions=MAX_SESSIONS, ttl_seconds=TTL_SECONDS):
+        self.path = path
+        self.max_turns = max_turns
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        self._appends = 0
+        self._lock = threading.Lock()
+        self.stats = {"evicted_lru": 0, "evicted_ttl": 0}
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS conversation_turns ("
+                " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " session_id TEXT NOT NULL,"
+                " role TEXT NOT NULL,"
+                " text TEXT NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_conversation_turns_session"
+                " ON conversation_turns (session_id, seq)"
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_history(self, session_id: str):
+        cutoff = time.time() - self.ttl_seconds
+        rows = self._connect().execute(
+            "SELECT role, text FROM conversation_turns"
+            " WHERE session_id = ? AND created_at > ?"
+            " ORDER BY seq DESC LIMIT ?",
+            (session_id, cutoff, self.max_turns),
+        ).fetchall()
+        return rows[::-1]
+
+    def append_turn(self, session_id: str, user_message: str, reply: str):
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO conversation_turns (session_id, role, text, created_at)"
+                " VALUES (?, ?, ?, ?)",
+                [(session_id, "User", user_message, now),
+                 (session_id, "Assistant", reply, now)],
+            )
+            conn.execute(
+                "DELETE FROM conversation_turns WHERE session_id = ? AND seq NOT IN"
+                " (SELECT seq FROM conversation_turns WHERE session_id = ?"
+                "  ORDER BY seq DESC LIMIT ?)",
+                (session_id, session_id, self.max_turns),
+            )
+        with self._lock:
+            self._appends += 1
+            purge = self._appends % self.PURGE_EVERY == 0
+        if purge:
+            self.purge()
+
+    def purge(self):
+        """Drop expired turns and the least recently active excess sessions."""
+        cutoff = time.time() - self.ttl_seconds
+        with self._connect() as conn:
+            expired = conn.execute(
+                "SELECT COUNT(DISTINCT session_id) FROM conversation_turns"
+                " WHERE session_id NOT IN (SELECT session_id FROM conversation_turns"
+                "  WHERE created_at > ?)",
+                (cutoff,),
+            ).fetchone()[0]
+            conn.execute("DELETE FROM conversation_turns WHERE created_at <= ?", (cutoff,))
+            overflow = conn.execute(
+                "SELECT session_id FROM conversation_turns GROUP BY session_id"
+                " ORDER BY MAX(seq) DESC LIMIT -1 OFFSET ?",
+                (self.max_sessions,),
+            ).fetchall()
+            conn.executemany(
+                "DELETE FROM conversation_turns WHERE session_id = ?", overflow
+            )
+        self.stats["evicted_ttl"] += expired
+        self.stats["evicted_lru"] += len(overflow)
+
+    def get_stats(self):
+        sessions = self._connect().execute(
+            "SELECT COUNT(DISTINCT session_id) FROM conversation_turns"
+        ).fetchone()[0]
+        return {"backend": "sqlite", "sessions": sessions, **self.stats}
+
+
+def from_env() -> ConversationStore:
+    backend = os.getenv("CONVERSATION_STORE", "memory").lower()
+    if backend == "sqlite":
+        return SQLiteConversationStore()
+    if backend != "memory":
+        raise RuntimeError(f"Unknown CONVERSATION_STORE '{backend}' (use memory or sqlite)")
+    return InMemoryConversationStore()
@@ -1,23 +1,35 @@
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
-from . import models, schemas
+import base64
+from datetime import date, datetime
+from typing import List, Optional
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import func, insert, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from . import models, schemas, menu_cache, versions, events, rollups, tracking_cache, kitchen_queue
 
 # Menu CRUD
+# Reads come from the in-process menu snapshot; every write bumps the "menu"
+# version in the same transaction and drops the local snapshot after commit.
 def get_menu(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Menu).offset(skip).limit(limit).all()
+    return list(menu_cache.get_snapshot(db).items[skip:skip + limit])
 
 def create_menu_item(db: Session, menu: schemas.MenuCreate):
     db_menu = models.Menu(**menu.dict())
     db.add(db_menu)
+    versions.bump_version(db, menu_cache.MENU_VERSION)
     db.commit()
+    menu_cache.invalidate()
     db.refresh(db_menu)
+    events.publish("menu_changed", item_id=db_menu.id)
     return db_menu
 
 def delete_menu_item(db: Session, item_id: int):
     db_item = db.query(models.Menu).filter(models.Menu.id == item_id).first()
     if db_item:
         db.delete(db_item)
+        versions.bump_version(db, menu_cache.MENU_VERSION)
         db.commit()
+        menu_cache.invalidate()
+        events.publish("menu_changed", item_id=item_id)
         return True
     return False
 
@@ -25,18 +37,28 @@ def get_menu_item_by_name(db: Session, name: str):
     return db.query(models.Menu).filter(models.Menu.item.ilike(f"%{name}%")).all()
 
 def get_categories(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Category).offset(skip).limit(limit).all()
+    return list(menu_cache.get_snapshot(db).categories[skip:skip + limit])
+
+def get_menu_rows(db: Session, skip: int = 0, limit: int = 100):
+    """get_menu as plain dicts (fast_json path)."""
+    return menu_cache.get_snapshot(db).item_rows[skip:skip + limit]
+
+def get_category_rows(db: Session, skip: int = 0, limit: int = 100):
+    return menu_cache.get_snapshot(db).category_rows[skip:skip + limit]
 
 def create_category(db: Session, category: schemas.CategoryCreate):
     db_category = models.Category(name=category.name, image_url=category.image_url)
     db.add(db_category)
+    versions.bump_version(db, menu_cache.MENU_VERSION)
     db.commit()
+    menu_cache.invalidate()
+    events.publish("menu_changed", category=db_category.name)
     db.refresh(db_category)
     return db_category
 
 # Restaurant Info CRUD
 def get_restaurant_info(db: Session):
-    return db.query(models.Restaurant).first()
+    return menu_cache.get_snapshot(db).restaurant
 
 def create_restaurant_info(db: Session, info: schemas.RestaurantCreate):
     db_info = db.query(models.Restaurant).first()
@@ -52,7 +74,10 @@ def create_restaurant_info(db: Session, info: schemas.RestaurantCreate):
         db_info = models.Restaurant(**info.dict())
         db.add(db_info)
     
+    versions.bump_version(db, menu_cache.MENU_VERSION)
     db.commit()
+    menu_cache.invalidate()
+    events.publish("menu_changed")
     db.refresh(db_info)
     return db_info
 
@@ -63,76 +88,236 @@ import string
 # ... (Restaurant CRUD)
 
 # Order CRUD
-def get_orders(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Order).options(
-        joinedload(models.Order.items).joinedload(models.OrderItem.menu_item)
-    ).order_by(models.Order.created_at.desc()).offset(skip).limit(limit).all()
+# Orders are listed newest first. Pages can be addressed by offset (skip) or,
+# for deep pages, by an opaque cursor holding the (created_at, id) of the last
+# row seen, which the (created_at, id) indexes serve without scanning skipped
+# rows.
+def encode_order_cursor(order) -> str:
+    raw = f"{order.created_at.isoformat()}|{order.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_order_cursor(cursor: str):
+    """Return (created_at, id); raises ValueError for a malformed cursor."""
+    try:
+        created_at, order_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(order_id)
+    # binascii.Error and UnicodeDecodeError are ValueErrors; a well-formed
+    # string of the wrong shape fails in split/fromisoformat/int instead.
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+def filter_orders(query, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+                  status: Optional[str] = None, created_from: Optional[datetime] = None,
+                  created_to: Optional[datetime] = None):
+    if status:
+        query = query.filter(models.Order.order_status == status)
+    if created_from:
+        query = query.filter(models.Order.created_at >= created_from)
+    if created_to:
+        query = query.filter(models.Order.created_at < created_to)
+    query = query.order_by(models.Order.created_at.desc(), models.Order.id.desc())
+    if cursor:
+        query = query.filter(
+            tuple_(models.Order.created_at, models.Order.id) < decode_order_cursor(cursor)
+        )
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+def get_orders(db: Session, skip: int = 0, limit: int = 100, **filters):
+    # selectinload keeps LIMIT on the orders themselves; a joined eager load
+    # would multiply rows per line item before the limit applies.
+    query = db.query(models.Order).options(
+        selectinload(models.Order.items).joinedload(models.OrderItem.menu_item)
+    )
+    return filter_orders(query, skip, limit, **filters).all()
+
+def get_order_summaries(db: Session, skip: int = 0, limit: int = 100, **filters):
+    """Header columns only, no line items: the kitchen list view."""
+    query = db.query(
+        models.Order.id,
+        models.Order.tracking_code,
+        models.Order.user_details,
+        models.Order.total_amount,
+        models.Order.order_status,
+        models.Order.created_at,
+    )
+    return filter_orders(query, skip, limit, **filters).all()
+
+def get_order_rows(db: Session, headers):
+    """schemas.Order-shaped dicts for order header rows (from get_order_summaries).
+
+    Line items and their menu items come from one joined column select
+    instead of ORM objects; key order follows the schemas.
+    """
+    orders = [{**row._asdict(), "items": []} for row in headers]
+    by_id = {order["id"]: order for order in orders}
+    if not by_id:
+        return orders
+    lines = db.query(
+        models.OrderItem.item_id, models.OrderItem.quantity, models.OrderItem.id,
+        models.OrderItem.order_id, models.OrderItem.unit_price,
+        models.Menu.item, models.Menu.category, models.Menu.price, models.Menu.description, models.Menu.id,
+    ).outerjoin(models.Menu, models.Menu.id == models.OrderItem.item_id).filter(
+        models.OrderItem.order_id.in_(by_id)
+    ).order_by(models.OrderItem.order_id, models.OrderItem.id)
+    for item_id, quantity, line_id, order_id, unit_price, name, category, price, description, menu_id in lines:
+        by_id[order_id]["items"].append({
+            "item_id": item_id,
+            "quantity": quantity,
+            "id": line_id,
+            "order_id": order_id,
+            "unit_price": unit_price,
+            "menu_item": None if menu_id is None else {
+                "item": name, "category": category, "price": price, "description": description, "id": menu_id,
+            },
+        })
+    return orders
 
 def generate_tracking_code():
     """Generate a unique 6-character alphanumeric code"""
     chars = string.ascii_uppercase + string.digits
     return ''.join(secrets.choice(chars) for _ in range(6))
 
-def create_order(db: Session, order: schemas.OrderCreate):
-    # Calculate total amount
-    total_amount = 0.0
-    db_items = []
-    
-    # Generate unique tracking code
-    code = generate_tracking_code()
-    # Ensure uniqueness (simple check)
-    while db.query(models.Order).filter(models.Order.tracking_code == code).first():
-        code = generate_tracking_code()
-
-    # Create Order object first
-    db_order = models.Order(
-        user_details=order.user_details,
-        tracking_code=code,
-        order_status="Pending"
-    )
-    db.add(db_order)
-    db.commit()
-    db.refresh(db_order)
-
-    # Process items
-    for item in order.items:
-        menu_item = db.query(models.Menu).filter(models.Menu.id == item.item_id).first()
-        if menu_item:
-            total_amount += menu_item.price * item.quantity
-            db_item = models.OrderItem(
-                order_id=db_order.id,
-                item_id=item.item_id,
-                quantity=item.quantity
+# Tracking codes are only guaranteed unique by the index on
+# orders.tracking_code; a collision rolls back and retries with fresh codes.
+# Codes of archived orders are skipped up front so they stay trackable.
+MAX_ORDER_INSERT_ATTEMPTS = 5
+
+def fresh_tracking_codes(db: Session, count: int):
+    """count distinct codes that no archived order uses."""
+    archive = models.OrderArchive
+    codes = set()
+    while len(codes) < count:
+        codes.update(generate_tracking_code() for _ in range(count - len(codes)))
+        codes -= set(db.scalars(select(archive.tracking_code).where(archive.tracking_code.in_(codes))))
+    return list(codes)
+
+def create_orders(db: Session, orders: List[schemas.OrderCreate]):
+    """Create several orders in a single transaction.
+
+    Line-item prices for the whole batch come from one IN (...) query and
+    everything is written with a single commit. Unknown item ids are skipped,
+    as before.
+    """
+    item_ids = {item.item_id for order in orders for item in order.items}
+    menu = {}
+    if item_ids:
+        menu = {
+            row.id: row for row in db.query(models.Menu.id, models.Menu.item, models.Menu.price)
+            .filter(models.Menu.id.in_(item_ids)).all()
+        }
+
+    for attempt in range(MAX_ORDER_INSERT_ATTEMPTS):
+        order_rows = []
+        item_rows = []  # (tracking code, item row) until order ids are known
+        rollup_lines = []
+        created_at = datetime.utcnow()
+        for order, code in zip(orders, fresh_tracking_codes(db, len(orders))):
+            total_amount = 0.0
+            for item in order.items:
+                menu_item = menu.get(item.item_id)
+                if menu_item is None:
+                    continue
+                total_amount += menu_item.price * item.quantity
+                item_rows.append((code, {
+                    "item_id": item.item_id,
+                    "quantity": item.quantity,
+                    "unit_price": menu_item.price,
+                }))
+                rollup_lines.append((
+                    created_at.date(), item.item_id, menu_item.item, item.quantity, menu_item.price
+                ))
+            order_rows.append({
+                "user_details": order.user_details,
+                "tracking_code": code,
+                "total_amount": total_amount,
+                "order_status": "Pending",
+                "created_at": created_at,
+            })
+
+        try:
+            # Core executemany: one INSERT for the orders (ids come back via
+            # RETURNING) and one for all of their line items.
+            ids_by_code = dict(
+                (code, order_id) for order_id, code in db.execute(
+                    insert(models.Order).returning(models.Order.id, models.Order.tracking_code),
+                    order_rows,
+                )
             )
-            db.add(db_item)
-    
-    # Update total amount
-    db_order.total_amount = total_amount
-    db.commit()
-    db.refresh(db_order)
-    return db_order
+            if item_rows:
+                db.execute(
+                    insert(models.OrderItem),
+                    [{"order_id": ids_by_code[code], **row} for code, row in item_rows],
+                )
+            adjust_status_count(db, "Pending", len(order_rows))
+            rollups.add_lines(db, rollup_lines)
+            version = versions.bump_version(db, versions.ORDERS)
+            db.commit()
+            break
+        except IntegrityError:
+            db.rollback()
+            if attempt == MAX_ORDER_INSERT_ATTEMPTS - 1:
+                raise
+
+    # Load the committed orders with their items in a fixed number of queries
+    # instead of lazy-loading each one during serialization.
+    ids = [ids_by_code[row["tracking_code"]] for row in order_rows]
+    tracking_cache.invalidate(*ids_by_code)  # drop cached "not found" entries
+    for row in order_rows:
+        events.publish(
+            "order_created", id=ids_by_code[row["tracking_code"]],
+            tracking_code=row["tracking_code"], total_amount=row["total_amount"],
+        )
+    loaded = {
+        o.id: o for o in db.query(models.Order).options(
+            selectinload(models.Order.items).joinedload(models.OrderItem.menu_item)
+        ).filter(models.Order.id.in_(ids)).all()
+    }
+    kitchen_queue.queue.orders_created([loaded[i] for i in ids], version)
+    return [loaded[i] for i in ids]
+
+def create_order(db: Session, order: schemas.OrderCreate):
+    return create_orders(db, [order])[0]
 
 def get_order_by_tracking_code(db: Session, tracking_code: str):
     return db.query(models.Order).filter(models.Order.tracking_code == tracking_code).first()
 
 def update_order_status(db: Session, order_id: int, status: str):
-
+    """Move an order to status; raises kitchen_queue.InvalidTransition for moves
+    the kitchen state machine doesn't allow (e.g. Completed -> Pending)."""
     db_order = db.query(models.Order).filter(models.Order.id == order_id).first()
     if db_order:
+        previous = db_order.order_status
+        kitchen_queue.check_transition(previous, status)
+        if previous != status:
+            adjust_status_count(db, previous, -1)
+            adjust_status_count(db, status, 1)
         db_order.order_status = status
+        version = versions.bump_version(db, versions.ORDERS)
         db.commit()
         db.refresh(db_order)
+        tracking_cache.invalidate(db_order.tracking_code)
+        kitchen_queue.queue.status_changed(db_order, previous, version)
+        events.publish(
+            "order_status_changed", id=order_id, previous=previous, status=status
+        )
     return db_order
 
-def get_analytics_data(db: Session):
-    # Query to sum quantity * price for each menu item
-    results = db.query(
-        models.Menu.item,
-        func.sum(models.OrderItem.quantity * models.Menu.price).label("total_income"),
-        func.sum(models.OrderItem.quantity).label("total_quantity")
-    ).join(models.OrderItem, models.Menu.id == models.OrderItem.item_id)\
-     .group_by(models.Menu.item).all()
-    
+def get_analytics_data(db: Session, start: Optional[date] = None, end: Optional[date] = None):
+    """Income and quantity per item between start and end (inclusive days)."""
+    sales = models.ItemDailySales
+    query = db.query(
+        sales.item_name,
+        func.sum(sales.income).label("total_income"),
+        func.sum(sales.quantity).label("total_quantity")
+    )
+    if start:
+        query = query.filter(sales.day >= start)
+    if end:
+        query = query.filter(sales.day <= end)
+    results = query.group_by(sales.item_name).having(func.sum(sales.quantity) > 0).all()
+
     return [{"name": r[0], "income": r[1], "quantity": r[2]} for r in results]
 
 def delete_order(db: Session, order_id: int):
@@ -140,26 +325,37 @@ def delete_order(db: Session, order_id: int):
     if db_order:
         # Delete associated order items first (if cascade is not set up, though usually handled by DB)
         # But for safety in this simple setup:
+        rollups.remove_lines(db, rollups.order_lines(db, [order_id]))
         db.query(models.OrderItem).filter(models.OrderItem.order_id == order_id).delete()
+        adjust_status_count(db, db_order.order_status, -1)
+        tracking_code = db_order.tracking_code
         db.delete(db_order)
+        version = versions.bump_version(db, versions.ORDERS)
         db.commit()
+        tracking_cache.invalidate(tracking_code)
+        kitchen_queue.queue.order_deleted(order_id, version)
+        events.publish("order_deleted", id=order_id)
         return True
     return False
 
+def adjust_status_count(db: Session, status: str, delta: int):
+    """Apply delta to the maintained per-status order count (same transaction)."""
+    updated = db.query(models.OrderStatusCount).filter(
+        models.OrderStatusCount.status == status
+    ).update({models.OrderStatusCount.count: models.OrderStatusCount.count + delta})
+    if not updated:
+        db.add(models.OrderStatusCount(status=status, count=delta))
+
 def get_order_statistics(db: Session):
     """Get order count by status"""
-    pending = db.query(models.Order).filter(models.Order.order_status == "Pending").count()
-    preparing = db.query(models.Order).filter(models.Order.order_status == "Preparing").count()
-    ready = db.query(models.Order).filter(models.Order.order_status == "Ready").count()
-    completed = db.query(models.Order).filter(models.Order.order_status == "Completed").count()
-    cancelled = db.query(models.Order).filter(models.Order.order_status == "Cancelled").count()
-    total = db.query(models.Order).count()
-    
+    counts = dict(
+        db.query(models.OrderStatusCount.status, models.OrderStatusCount.count).all()
+    )
     return {
-        "pending": pending,
-        "preparing": preparing,
-        "ready": ready,
-        "completed": completed,
-        "cancelled": cancelled,
-        "total": total
-    }
+        "pending": counts.get("Pending", 0),
+        "preparing": counts.get("Preparing", 0),
+        "ready": counts.get("Ready", 0),
+        "completed": counts.get("Completed", 0),
+        "cancelled": counts.get("Cancelled", 0),
+        "total": sum(counts.values())
+    }
\ No newline at end of file
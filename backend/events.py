@@ -0,0 +1,88 @@
+import asyncio
+import os
+import threading
+from . import versions, menu_cache
+from .database import SessionLocal
+
+# Server push for dashboards (GET /events).
+#
+# crud publishes order_created / order_status_changed / order_deleted /
+# menu_changed after each committed write. publish() is safe to call from
+# the threadpool that runs sync endpoints; events are handed to each
+# subscriber's event loop. Writes handled by other uvicorn workers are
+# picked up by watch_versions(), which compares the shared version rows and
+# publishes orders_changed / menu_changed when they move.
+
+SUBSCRIBER_QUEUE_SIZE = 100
+VERSION_POLL_SECONDS = float(os.getenv("EVENTS_VERSION_POLL_SECONDS", "2"))
+WATCHED_VERSIONS = {
+    versions.ORDERS: "orders_changed",
+    menu_cache.MENU_VERSION: "menu_changed",
+}
+
+
+class EventBroker:
+    def __init__(self):
+        self._subscribers = {}  # queue -> event loop it belongs to
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> asyncio.Queue:
+        """Register a subscriber; call from inside the event loop."""
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        with self._lock:
+            self._subscribers.pop(queue, None)
+
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event: str, data: dict):
+        with self._lock:
+            subscribers = list(self._subscribers.items())
+        for queue, loop in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, (event, data))
+            except RuntimeError:
+                # Loop already closed; the subscriber is going away.
+                pass
+
+
+def _offer(queue: asyncio.Queue, item):
+    # A client that stops reading loses events rather than growing the
+    # queue; its next refetch catches it up.
+    if not queue.full():
+        queue.put_nowait(item)
+
+
+broker = EventBroker()
+
+
+def publish(event: str, **data):
+    if broker.subscriber_count():
+        broker.publish(event, data)
+
+
+def read_versions():
+    db = SessionLocal()
+    try:
+        return {name: versions.get_version(db, name) for name in WATCHED_VERSIONS}
+    finally:
+        db.close()
+
+
+async def watch_versions():
+    """Publish a *_changed event whenever a shared version row advances."""
+    seen = await asyncio.to_thread(read_versions)
+    while True:
+        await asyncio.sleep(VERSION_POLL_SECONDS)
+        if not broker.subscriber_count():
+            continue
+        current = await asyncio.to_thread(read_versions)
+        for name, event in WATCHED_VERSIONS.items():
+            if current[name] != seen[name]:
+                broker.publish(event, {"version": current[name]})
+        seen = current
@@ -0,0 +1,134 @@
+import csv
+import io
+import json
+import os
+from datetime import date, datetime
+from typing import Optional
+from sqlalchemy import select
+from .database import SessionLocal
+from . import models
+
+# Streaming report exports (GET /orders/export, GET /analytics/export).
+#
+# Rows are read with yield_per, so the driver hands them over
+# EXPORT_BATCH_ROWS at a time as plain tuples (no ORM objects, no Pydantic),
+# and each batch is encoded and sent before the next is read: memory stays
+# flat however long the date range. The generators open their own session,
+# because they keep running after the endpoint has returned; Starlette
+# iterates them in its threadpool, off the event loop.
+
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "2000"))
+
+ORDER_COLUMNS = [
+    "order_id", "tracking_code", "user_details", "total_amount", "order_status", "created_at",
+    "item_id", "item_name", "quantity", "unit_price",
+]
+ANALYTICS_COLUMNS = ["day", "item_id", "item_name", "quantity", "income"]
+
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+def iso(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+
+def order_lines_query(order, order_item, status=None, created_from=None, created_to=None):
+    """One row per order line (orders without lines get one row of NULLs), oldest first."""
+    query = (
+        select(
+            order.id, order.tracking_code, order.user_details, order.total_amount,
+            order.order_status, order.created_at,
+            order_item.item_id, models.Menu.item, order_item.quantity, order_item.unit_price,
+        )
+        .outerjoin(order_item, order_item.order_id == order.id)
+        .outerjoin(models.Menu, models.Menu.id == order_item.item_id)
+    )
+    if status:
+        query = query.where(order.order_status == status)
+    if created_from:
+        query = query.where(order.created_at >= created_from)
+    if created_to:
+        query = query.where(order.created_at < created_to)
+    return query.order_by(order.created_at, order.id, order_item.id)
+
+
+def stream_batches(queries):
+    """Row batches of each query in turn, from a session of our own."""
+    with SessionLocal() as db:
+        for query in queries:
+            result = db.execute(query, execution_options={"yield_per": EXPORT_BATCH_ROWS})
+            for batch in result.partitions():
+                yield batch
+
+
+def encode_csv(batches, columns):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for batch in batches:
+        writer.writerows([iso(value) for value in row] for row in batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def encode_ndjson(batches, columns):
+    for batch in batches:
+        yield "".join(
+            json.dumps(dict(zip(columns, [iso(value) for value in row])), ensure_ascii=False) + "\n"
+            for row in batch
+        )
+
+
+def encode_orders_ndjson(batches):
+    """One object per order with its lines nested; lines of an order arrive together."""
+    current = None
+    for batch in batches:
+        out = []
+        for row in batch:
+            if current is None or current["id"] != row[0]:
+                if current is not None:
+                    out.append(json.dumps(current, ensure_ascii=False) + "\n")
+                current = {
+                    "id": row[0], "tracking_code": row[1], "user_details": row[2],
+                    "total_amount": row[3], "order_status": row[4], "created_at": iso(row[5]),
+                    "items": [],
+                }
+            if row[6] is not None:
+                current["items"].append(
+                    {"item_id": row[6], "item_name": row[7], "quantity": row[8], "unit_price": row[9]}
+                )
+        yield "".join(out)
+    if current is not None:
+        yield json.dumps(current, ensure_ascii=False) + "\n"
+
+
+def export_orders(format: str, status: Optional[str] = None, created_from: Optional[datetime] = None,
+                  created_to: Optional[datetime] = None, include_archived: bool = False):
+    """Chunks of the orders export. CSV has one row per order line; NDJSON one object per order.
+
+    With include_archived, archived orders come first (they are the oldest).
+    """
+    filters = dict(status=status, created_from=created_from, created_to=created_to)
+    queries = [order_lines_query(models.Order, models.OrderItem, **filters)]
+    if include_archived:
+        queries.insert(0, order_lines_query(models.OrderArchive, models.OrderItemArchive, **filters))
+    batches = stream_batches(queries)
+    if format == "ndjson":
+        return encode_orders_ndjson(batches)
+    return encode_csv(batches, ORDER_COLUMNS)
+
+
+def export_analytics(format: str, start: Optional[date] = None, end: Optional[date] = None):
+    """Chunks of the daily per-item sales between start and end (inclusive)."""
+    sales = models.ItemDailySales
+    query = select(sales.day, sales.item_id, sales.item_name, sales.quantity, sales.income)
+    if start:
+        query = query.where(sales.day >= start)
+    if end:
+        query = query.where(sales.day <= end)
+    batches = stream_batches([query.order_by(sales.day, sales.item_id)])
+    if format == "ndjson":
+        return encode_ndjson(batches, ANALYTICS_COLUMNS)
+    return encode_csv(batches, ANALYTICS_COLUMNS)
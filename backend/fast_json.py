@@ -0,0 +1,45 @@
+import json
+import os
+from datetime import date, datetime
+from fastapi import Response
+
+# Opt-in fast path for the list endpoints (/menu/, /categories, /orders/).
+#
+# With FAST_JSON=1 those endpoints build plain dicts straight from column
+# selects (or from the menu snapshot) and return them encoded in one call,
+# skipping FastAPI's per-row response_model validation. The JSON is the same
+# as the schemas produce (benchmarks/bench_serialization.py checks that).
+# orjson is used when installed (pip install orjson); otherwise the standard
+# json module, which is still faster than validating every row.
+
+ENABLED = os.getenv("FAST_JSON", "0").lower() in ("1", "true", "yes")
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def respond(content, response: Response) -> FastJSONResponse:
+    """content as a FastJSONResponse, keeping headers already set on response (ETag, cursor)."""
+    headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    return FastJSONResponse(content, headers=headers)
@@ -0,0 +1,185 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from .menu_index import normalize
+from .ttl_cache import TTLCache
+
+# Replay of retried requests instead of running them twice.
+#
+# POST /orders/, /orders/bulk, /chat/ and /chat/stream accept an
+# Idempotency-Key header: the first request with a key runs, its result is
+# kept for IDEMPOTENCY_KEY_TTL_SECONDS, and later requests with the same key
+# (and the same body) get that result back without creating another order
+# or calling the LLM. A duplicate that arrives while the first is still
+# running waits for it. Reusing a key with a different body is an error.
+#
+# Chat also deduplicates without a key: the same message in the same session
+# within CHAT_DEDUP_WINDOW_SECONDS is treated as a retry of the first one.
+# Not in the "default" session, which every client that sends no session_id
+# shares: there the same message usually comes from different customers.
+#
+# Failed requests are not stored, so their retries run again. Entries live
+# in the worker's memory, like the conversation store: a retry routed to a
+# different uvicorn worker is not recognised.
+
+KEY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_KEY_TTL_SECONDS", "86400"))
+MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))
+CHAT_DEDUP_WINDOW_SECONDS = float(os.getenv("CHAT_DEDUP_WINDOW_SECONDS", "10"))
+CHAT_DEDUP_MAX_ENTRIES = int(os.getenv("CHAT_DEDUP_MAX_ENTRIES", "10000"))
+WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "30"))
+SHARED_SESSION = "default"
+
+
+class IdempotencyError(Exception):
+    status_code = 409
+    headers = None
+
+
+class KeyReused(IdempotencyError):
+    status_code = 422
+
+    def __init__(self):
+        super().__init__("Idempotency-Key was already used with a different request body")
+
+
+class StillRunning(IdempotencyError):
+    headers = {"Retry-After": "1"}
+
+    def __init__(self):
+        super().__init__("A request with this Idempotency-Key is still being processed")
+
+
+class Entry:
+    __slots__ = ("fingerprint", "result", "done")
+
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.result = None
+        self.done = threading.Event()
+
+
+def fingerprint(payload) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class IdempotencyStore:
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.cache = TTLCache(max_entries, ttl_seconds)
+        self._lock = threading.Lock()
+        self.stats = {"executed": 0, "replayed": 0, "conflicts": 0}
+
+    def begin(self, key, fingerprint: str):
+        """(entry, True) if the caller runs the request, (entry, False) for a duplicate."""
+        with self._lock:
+            entry = self.cache.get(key)
+            if entry is None:
+                entry = Entry(fingerprint)
+                self.cache.set(key, entry)
+                self.stats["executed"] += 1
+                return entry, True
+        if entry.fingerprint != fingerprint:
+            self.stats["conflicts"] += 1
+            raise KeyReused()
+        return entry, False
+
+    def peek(self, key, fingerprint: str):
+        """The entry for key if there is one; KeyReused if it was made for another body."""
+        entry = self.cache.get(key)
+        if entry is not None and entry.fingerprint != fingerprint:
+            self.stats["conflicts"] += 1
+            raise KeyReused()
+        return entry
+
+    def complete(self, key, entry: Entry, result, keep: bool = True):
+        if keep:
+            entry.result = result
+        else:
+            self._forget(key, entry)
+        entry.done.set()
+
+    def abandon(self, key, entry: Entry):
+        """The request failed: drop it so a retry runs again."""
+        self._forget(key, entry)
+        entry.done.set()
+
+    def _forget(self, key, entry: Entry):
+        with self._lock:
+            if self.cache.get(key) is entry:
+                self.cache.pop(key)
+
+    def replayed(self, entry: Entry):
+        """Result of a finished duplicate, or None if the original failed."""
+        if entry.result is not None:
+            self.stats["replayed"] += 1
+        return entry.result
+
+    def get_stats(self):
+        return {**self.stats, "entries": len(self.cache), "ttl_seconds": self.cache.ttl_seconds}
+
+
+keys = IdempotencyStore(MAX_KEYS, KEY_TTL_SECONDS)
+chat_messages = IdempotencyStore(CHAT_DEDUP_MAX_ENTRIES, CHAT_DEDUP_WINDOW_SECONDS)
+
+
+def run(store: IdempotencyStore, key, fingerprint: str, fn):
+    """(result, replayed): fn() once per key; duplicates get its result."""
+    while True:
+        entry, owner = store.begin(key, fingerprint)
+        if owner:
+            try:
+                result = fn()
+            except BaseException:
+                store.abandon(key, entry)
+                raise
+            store.complete(key, entry, result)
+            return result, False
+        if not entry.done.wait(WAIT_SECONDS):
+            raise StillRunning()
+        result = store.replayed(entry)
+        if result is not None:
+            return result, True
+        # The original failed and was dropped; run this one instead.
+
+
+async def run_async(store: IdempotencyStore, key, fingerprint: str, fn, keep=lambda result: True):
+    """run() for coroutines; results for which keep(result) is false are not replayed."""
+    while True:
+        entry, owner = store.begin(key, fingerprint)
+        if owner:
+            try:
+                result = await fn()
+            except BaseException:
+                store.abandon(key, entry)
+                raise
+            store.complete(key, entry, result, keep(result))
+            return result, False
+        result = await wait_async(store, entry)
+        if result is not None:
+            return result, True
+
+
+async def wait_async(store: IdempotencyStore, entry: Entry):
+    """Wait for a duplicate's original without blocking the event loop; None if it failed."""
+    if not entry.done.is_set():
+        # Only duplicates that overlap their original get here; one pool
+        # thread each, for at most WAIT_SECONDS.
+        if not await asyncio.to_thread(entry.done.wait, WAIT_SECONDS):
+            raise StillRunning()
+    return store.replayed(entry)
+
+
+def chat_request(session_id: str, message: str, idempotency_key=None):
+    """(store, key, fingerprint) for a chat message: by Idempotency-Key if given,
+    else by content; None when it must not be deduplicated."""
+    digest = fingerprint(normalize(message))
+    if idempotency_key:
+        return keys, ("chat", session_id, idempotency_key), digest
+    if session_id == SHARED_SESSION:
+        return None
+    return chat_messages, ("chat", session_id, digest), digest
+
+
+def get_stats():
+    return {"keys": keys.get_stats(), "chat_messages": chat_messages.get_stats()}
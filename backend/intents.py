@@ -0,0 +1,206 @@
+import os
+import re
+import threading
+from .menu_index import normalize
+from .order_parser import AMBIGUOUS_NUMBER_WORDS, quantity_of
+
+# Rule-based intent router that runs ahead of the LLM.
+#
+# Every synonym (English, Roman Urdu, Urdu script) is compiled into one regex
+# alternation, longest phrase first, so a message is scanned once no matter
+# how many synonyms there are. Each synonym carries a weight; an intent's
+# confidence is 1 - prod(1 - weight) over the distinct synonyms found, so
+# one strong phrase or several weak ones clear ROUTER_MIN_CONFIDENCE.
+#
+# chatbot.handle_fast_paths tries the detected intents best first. order and
+# track need the database; menu, price and contact are answered here from
+# the menu snapshot. Anything unanswered falls through to the LLM.
+
+MIN_CONFIDENCE = float(os.getenv("ROUTER_MIN_CONFIDENCE", "0.5"))
+QUANTITY_ORDER_WEIGHT = 0.4  # a quantity in the message ("I want 2 / two ...") counts towards "order"
+MAX_LISTED_ITEMS = 30
+
+INTENT_KEYWORDS = {
+    "order": {
+        "order": 0.6, "buy": 0.8, "purchase": 0.8, "give me": 0.8, "i ll have": 0.9,
+        # Weak on their own ("I want a refund"): need another order phrase or a quantity.
+        "i want": 0.4, "i would like": 0.4, "send me": 0.4,
+        "chahiye": 0.7, "de do": 0.7, "dedo": 0.7, "mangwana": 0.8, "bhej do": 0.7,
+        "order karo": 0.9, "order kar do": 0.9,
+        "آرڈر": 0.6, "چاہیے": 0.7, "خریدنا": 0.8,
+    },
+    "track": {
+        "track": 0.9, "tracking": 0.9, "order status": 0.95, "status of my order": 0.95,
+        "where is my order": 0.95, "mera order kahan": 0.95, "order kahan hai": 0.95,
+        "order ka status": 0.95, "ٹریک": 0.9, "آرڈر کہاں": 0.95,
+    },
+    "price": {
+        "price": 0.8, "prices": 0.8, "cost": 0.7, "how much": 0.8, "rate": 0.4,
+        "kitne ka": 0.8, "kitnay ka": 0.8, "kitne ki": 0.8, "kitne mein": 0.8,
+        "qeemat": 0.9, "keemat": 0.9, "قیمت": 0.9, "کتنے کا": 0.8,
+    },
+    "menu": {
+        "menu": 0.8, "what do you have": 0.8, "what do you sell": 0.8, "what do you serve": 0.8,
+        "options": 0.5, "items": 0.5, "list": 0.5, "show me": 0.5, "do you have": 0.5,
+        "kya milta": 0.8, "kya kya hai": 0.8, "kya hai aap ke pas": 0.8, "مینو": 0.8,
+    },
+    "contact": {
+        "phone": 0.8, "contact": 0.8, "whatsapp": 0.8, "number": 0.4, "call": 0.4,
+        "address": 0.8, "location": 0.7, "where are you": 0.8, "owner": 0.7,
+        "kahan hai": 0.5, "kahan ho": 0.6, "malik": 0.7, "rabta": 0.8,
+        "فون": 0.8, "رابطہ": 0.8, "پتہ": 0.7, "مالک": 0.7,
+    },
+}
+
+# Words customers use for a category that differ from its name on the menu.
+CATEGORY_SYNONYMS = {
+    "drink": "beverage", "drinks": "beverage", "beverages": "beverage", "cold drink": "beverage",
+    "sweet": "dessert", "sweets": "dessert", "desserts": "dessert",
+    "burger": "burgers", "sandwiches": "sandwich", "salads": "salad", "pizzas": "pizza",
+}
+
+_keyword_intents = {}
+for _intent, _keywords in INTENT_KEYWORDS.items():
+    for _phrase, _weight in _keywords.items():
+        _keyword_intents.setdefault(normalize(_phrase), []).append((_intent, _weight))
+
+_pattern = re.compile(
+    r"(?<!\w)(?:"
+    + "|".join(re.escape(p) for p in sorted(_keyword_intents, key=len, reverse=True))
+    + r")(?!\w)"
+)
+
+_stats_lock = threading.Lock()
+stats = {"messages": 0, "answered": 0}
+intent_stats = {intent: {"detected": 0, "answered": 0} for intent in INTENT_KEYWORDS}
+
+
+def detect(message: str):
+    """[(intent, confidence)] at or above MIN_CONFIDENCE, most confident first."""
+    found = {}
+    text = normalize(message)
+    for phrase in set(_pattern.findall(text)):
+        for intent, weight in _keyword_intents[phrase]:
+            found.setdefault(intent, []).append(weight)
+    if "order" in found and has_quantity(text):
+        found["order"].append(QUANTITY_ORDER_WEIGHT)
+
+    scored = []
+    for intent, weights in found.items():
+        miss = 1.0
+        for weight in weights:
+            miss *= 1 - weight
+        confidence = round(1 - miss, 3)
+        if confidence >= MIN_CONFIDENCE:
+            scored.append((intent, confidence))
+    # Ties keep INTENT_KEYWORDS order (order before track before price ...).
+    order = list(INTENT_KEYWORDS)
+    scored.sort(key=lambda s: (-s[1], order.index(s[0])))
+    with _stats_lock:
+        stats["messages"] += 1
+        for intent, _ in scored:
+            intent_stats[intent]["detected"] += 1
+    return scored
+
+
+def has_quantity(text: str) -> bool:
+    """Whether normalized text holds a quantity as order_parser reads them
+    (digits or number words), leaving out words like "do" that are usually not one."""
+    return any(quantity_of(token) is not None for token in text.split() if token not in AMBIGUOUS_NUMBER_WORDS)
+
+
+def record_answer(intent: str):
+    with _stats_lock:
+        stats["answered"] += 1
+        intent_stats[intent]["answered"] += 1
+
+
+def get_stats():
+    with _stats_lock:
+        messages = stats["messages"]
+        return {
+            **stats,
+            "hit_rate": round(stats["answered"] / messages, 3) if messages else 0.0,
+            "intents": {
+                intent: {**counts, "hit_rate": round(counts["answered"] / counts["detected"], 3) if counts["detected"] else 0.0}
+                for intent, counts in intent_stats.items()
+            },
+        }
+
+
+# ------------------ SNAPSHOT ANSWERS ------------------
+def mentioned_categories(snapshot, message: str):
+    """Menu categories named in the message, in menu order."""
+    words = f" {normalize(message)} "
+    wanted = {target for phrase, target in CATEGORY_SYNONYMS.items() if f" {phrase} " in words}
+    categories = []
+    for category in dict.fromkeys(item.category for item in snapshot.items):
+        name = normalize(category)
+        if name and (f" {name} " in words or f" {name}s " in words or name in wanted):
+            categories.append(category)
+    return categories
+
+
+def format_items(items) -> str:
+    lines = [f"• {item.item} - ${item.price:.2f}" for item in items[:MAX_LISTED_ITEMS]]
+    if len(items) > MAX_LISTED_ITEMS:
+        lines.append(f"…and {len(items) - MAX_LISTED_ITEMS} more")
+    return "\n".join(lines)
+
+
+def answer_menu(snapshot, message: str):
+    if not snapshot.items:
+        return None
+    categories = mentioned_categories(snapshot, message)
+    if categories:
+        sections = [
+            f"**{category}**\n" + format_items([i for i in snapshot.items if i.category == category])
+            for category in categories
+        ]
+        return "🍽 **Here's what we have:**\n\n" + "\n\n".join(sections)
+
+    if len(snapshot.items) <= MAX_LISTED_ITEMS:
+        by_category = {}
+        for item in snapshot.items:
+            by_category.setdefault(item.category, []).append(item)
+        sections = [f"**{category}**\n" + format_items(items) for category, items in by_category.items()]
+        return "🍽 **Our Menu**\n\n" + "\n\n".join(sections)
+
+    counts = {}
+    for item in snapshot.items:
+        counts[item.category] = counts.get(item.category, 0) + 1
+    lines = [f"• {category} ({count} items)" for category, count in counts.items()]
+    return "🍽 **Our Menu**\n\n" + "\n".join(lines) + "\n\nAsk me about any category to see its items!"
+
+
+def answer_price(snapshot, message: str):
+    matches = [item for item, score in snapshot.index.search(message, 70, limit=5)]
+    categories = mentioned_categories(snapshot, message)
+    seen = {item.id for item in matches}
+    matches += [item for item in snapshot.items if item.category in categories and item.id not in seen]
+    if not matches:
+        return None
+    return "💰 **Prices**\n\n" + format_items(matches)
+
+
+def answer_contact(snapshot, message: str):
+    restaurant = snapshot.restaurant
+    return (
+        f"📞 **{restaurant.name if restaurant else 'Fast Food'}**\n\n"
+        f"Phone: {restaurant.phone if restaurant else '03151095812'}\n"
+        f"Address: {restaurant.address if restaurant else 'Karachi'}\n"
+        f"Owner: {restaurant.owner if restaurant else 'Ameer Gul'}"
+    )
+
+
+SNAPSHOT_ANSWERS = {
+    "menu": answer_menu,
+    "price": answer_price,
+    "contact": answer_contact,
+}
+
+
+def answer(intent: str, message: str, snapshot):
+    """Reply for a snapshot-answerable intent, or None if it can't be answered here."""
+    handler = SNAPSHOT_ANSWERS.get(intent)
+    return handler(snapshot, message) if handler else None
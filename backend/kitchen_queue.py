@@ -0,0 +1,229 @@
+import bisect
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from sqlalchemy.orm import Session, selectinload
+from . import models, versions, metrics
+
+# Kitchen order queue (GET /kitchen/queue) and the order status state machine.
+#
+# Orders move Pending -> Preparing -> Ready -> Completed, and any active
+# order may be Cancelled; crud.update_order_status rejects every other move
+# with InvalidTransition. Active orders live in memory, one queue per status
+# ordered oldest first, so the kitchen view costs O(active orders) however
+# many finished orders the table holds. Completed and Cancelled orders leave
+# the structure.
+#
+# crud applies its own writes here after commit, passing the "orders"
+# version it wrote. Changes are applied in version order; one that arrives
+# ahead of its predecessor (concurrent requests finish in any order) waits
+# in a small buffer. Writes from other workers move the shared version
+# without touching this queue, so it is checked at most once per
+# KITCHEN_QUEUE_CHECK_INTERVAL seconds and the active orders are reloaded
+# (one query on the order_status index) when it has moved.
+
+CHECK_INTERVAL_SECONDS = float(os.getenv("KITCHEN_QUEUE_CHECK_INTERVAL", "1"))
+DURATION_WINDOW = 200  # recent transitions averaged in get_stats()
+MAX_BUFFERED_CHANGES = 100
+
+TRANSITIONS = {
+    "Pending": {"Preparing", "Cancelled"},
+    "Preparing": {"Ready", "Cancelled"},
+    "Ready": {"Completed", "Cancelled"},
+    "Completed": set(),
+    "Cancelled": set(),
+}
+ACTIVE_STATUSES = ("Pending", "Preparing", "Ready")
+# Time spent in a status, named by the transition that ends it.
+STAGES = {
+    ("Pending", "Preparing"): "wait",
+    ("Preparing", "Ready"): "prep",
+    ("Ready", "Completed"): "handoff",
+}
+
+
+class InvalidTransition(ValueError):
+    def __init__(self, previous: str, status: str):
+        allowed = ", ".join(sorted(TRANSITIONS.get(previous, ()))) or "none"
+        super().__init__(f"Cannot change order status from {previous} to {status} (allowed: {allowed})")
+        self.previous = previous
+        self.status = status
+
+
+def check_transition(previous: str, status: str):
+    """Raise InvalidTransition unless previous -> status is allowed.
+
+    Setting the current status again is a no-op, and orders with a status
+    outside the state machine (legacy rows) may move anywhere.
+    """
+    if previous == status or previous not in TRANSITIONS:
+        return
+    if status not in TRANSITIONS[previous]:
+        raise InvalidTransition(previous, status)
+
+
+def sort_key(entry):
+    return (entry["created_at"] or datetime.min, entry["id"])
+
+
+def order_entry(order, status_since=None):
+    """Ready-to-render dict for an Order with its items (and menu items) loaded."""
+    return {
+        "id": order.id,
+        "tracking_code": order.tracking_code,
+        "user_details": order.user_details,
+        "total_amount": order.total_amount,
+        "order_status": order.order_status,
+        "created_at": order.created_at,
+        # Unknown after a reload, except for Pending orders (pending since creation).
+        "status_since": status_since or (order.created_at if order.order_status == "Pending" else None),
+        "items": [
+            {
+                "item_id": line.item_id,
+                "item": line.menu_item.item if line.menu_item else f"Item {line.item_id}",
+                "quantity": line.quantity,
+            }
+            for line in order.items
+        ],
+    }
+
+
+class KitchenQueue:
+    def __init__(self):
+        self.version = None  # "orders" version the queues reflect
+        self.checked_at = 0.0
+        self.entries = {}  # order id -> entry
+        self.buffered = {}  # version -> change that arrived before version - 1
+        self.queues = {status: [] for status in ACTIVE_STATUSES}  # sorted (created_at, id)
+        self.durations = {stage: deque(maxlen=DURATION_WINDOW) for stage in STAGES.values()}
+        self.stats = {"reloads": 0, "applied": 0}
+        self._lock = threading.Lock()
+
+    # ------------------ READ ------------------
+    def get_queue(self, db: Session):
+        """Active orders per status, oldest first, at the current version."""
+        self.ensure_current(db)
+        with self._lock:
+            return {
+                "version": self.version,
+                "queues": {
+                    status: [self.entries[order_id] for _, order_id in keys]
+                    for status, keys in self.queues.items()
+                },
+            }
+
+    def ensure_current(self, db: Session):
+        if time.monotonic() - self.checked_at < CHECK_INTERVAL_SECONDS:
+            return
+        with self._lock:
+            # Version before rows, as in menu_cache: a write landing in
+            # between only makes the next check reload again.
+            version = versions.get_version(db, versions.ORDERS)
+            if version != self.version:
+                self.reload(db, version)
+            self.checked_at = time.monotonic()
+
+    def reload(self, db: Session, version: int):
+        orders = db.query(models.Order).options(
+            selectinload(models.Order.items).joinedload(models.OrderItem.menu_item)
+        ).filter(models.Order.order_status.in_(ACTIVE_STATUSES)).all()
+        previous = self.entries
+        self.entries = {}
+        self.buffered = {}
+        self.queues = {status: [] for status in ACTIVE_STATUSES}
+        for order in orders:
+            known = previous.get(order.id)
+            since = known["status_since"] if known and known["order_status"] == order.order_status else None
+            self._place(order_entry(order, since))
+        self.version = version
+        self.stats["reloads"] += 1
+
+    # ------------------ WRITES (called by crud after commit) ------------------
+    def orders_created(self, orders, version: int):
+        entries = [order_entry(order) for order in orders]
+
+        def change():
+            for entry in entries:
+                self._place(entry)
+
+        with self._lock:
+            self._apply(version, change)
+
+    def status_changed(self, order, previous: str, version: int):
+        now = datetime.utcnow()
+        with self._lock:
+            entry = self.entries.get(order.id)
+            stage = STAGES.get((previous, order.order_status))
+            if stage and entry and entry["status_since"]:
+                seconds = (now - entry["status_since"]).total_seconds()
+                self.durations[stage].append(seconds)
+                metrics.kitchen_stage_duration.observe(seconds, stage)
+            fallback = order_entry(order, now) if entry is None and order.order_status in ACTIVE_STATUSES else None
+
+            def change():
+                current = self.entries.get(order.id)
+                if current:
+                    self._remove(current)
+                if order.order_status in ACTIVE_STATUSES:
+                    if current:
+                        self._place({**current, "order_status": order.order_status, "status_since": now})
+                    elif fallback:
+                        self._place(fallback)
+
+            self._apply(version, change)
+
+    def order_deleted(self, order_id: int, version: int):
+        def change():
+            entry = self.entries.get(order_id)
+            if entry:
+                self._remove(entry)
+
+        with self._lock:
+            self._apply(version, change)
+
+    def _apply(self, version: int, change):
+        """Run change (the write that produced version) once every earlier version is in."""
+        if self.version is None or version <= self.version:
+            return  # not loaded yet, or already part of a reload
+        self.buffered[version] = change
+        while self.version + 1 in self.buffered:
+            self.version += 1
+            self.buffered.pop(self.version)()
+            self.stats["applied"] += 1
+        if len(self.buffered) > MAX_BUFFERED_CHANGES:
+            self.checked_at = 0.0  # the gap is another worker's write; reload on next read
+
+    def _place(self, entry):
+        if entry["order_status"] not in self.queues:
+            return
+        self.entries[entry["id"]] = entry
+        bisect.insort(self.queues[entry["order_status"]], sort_key(entry))
+
+    def _remove(self, entry):
+        keys = self.queues[entry["order_status"]]
+        key = sort_key(entry)
+        position = bisect.bisect_left(keys, key)
+        if position < len(keys) and keys[position] == key:
+            del keys[position]
+        del self.entries[entry["id"]]
+
+    # ------------------ STATS ------------------
+    def get_stats(self):
+        with self._lock:
+            depth = {status: len(keys) for status, keys in self.queues.items()}
+            averages = {
+                f"avg_{stage}_seconds": round(sum(samples) / len(samples), 1) if samples else None
+                for stage, samples in self.durations.items()
+            }
+            return {
+                "version": self.version,
+                "depth": depth,
+                "active": sum(depth.values()),
+                **averages,
+                **self.stats,
+            }
+
+
+queue = KitchenQueue()
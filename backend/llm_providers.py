@@ -0,0 +1,368 @@
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import NamedTuple
+
+from . import metrics
+from .menu_index import normalize
+from .response_cache import classify_faq
+
+# LLM backends behind chatbot.query_llm, chosen by LLM_PROVIDER:
+#
+#   gemini  Google Gemini (GOOGLE_API_KEY, GEMINI_MODEL)
+#   local   a small CPU model: llama.cpp for a .gguf LOCAL_LLM_MODEL path,
+#           otherwise a transformers text-generation pipeline. Neither
+#           package is in requirements.txt; install the one you use.
+#   stub    deterministic canned replies with configurable latency, for
+#           offline load tests of the whole /chat/ pipeline
+#
+# LLM_CHEAP_PROVIDER, when set, answers FAQ-style messages (menu, hours,
+# contact, ...) so they don't spend calls on the main provider. Providers
+# are created on first use and load their client or weights lazily; each
+# keeps call, latency and token counters for GET /llm/stats.
+
+logger = logging.getLogger(__name__)
+
+PROVIDER = os.getenv("LLM_PROVIDER", "gemini")
+CHEAP_PROVIDER = os.getenv("LLM_CHEAP_PROVIDER", "")
+
+LOCAL_LLM_MODEL = os.getenv("LOCAL_LLM_MODEL", "Qwen/Qwen2.5-0.5B-Instruct")
+LOCAL_LLM_MAX_NEW_TOKENS = int(os.getenv("LOCAL_LLM_MAX_NEW_TOKENS", "256"))
+
+STUB_LLM_LATENCY_SECONDS = float(os.getenv("STUB_LLM_LATENCY_SECONDS", "0"))
+STUB_LLM_TOKENS_PER_SECOND = float(os.getenv("STUB_LLM_TOKENS_PER_SECOND", "0"))  # 0 = no per-token delay
+
+EMPTY_REPLY = "⚠️ AI is temporarily unavailable. (Empty response)"
+
+
+class Completion(NamedTuple):
+    text: str
+    prompt_tokens: int
+    completion_tokens: int
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for backends that don't report usage."""
+    return (len(text) + 3) // 4
+
+
+class LLMProvider(ABC):
+    """A text-generation backend.
+
+    Subclasses implement generate(); generate_async() and stream() default
+    to running it in a worker thread and yielding the whole reply at once.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            "calls": 0, "errors": 0, "timeouts": 0,
+            "latency_seconds_total": 0.0, "latency_seconds_max": 0.0,
+            "prompt_tokens": 0, "completion_tokens": 0,
+        }
+
+    def is_available(self) -> bool:
+        """Load the client or model if needed; False if this backend can't answer."""
+        return True
+
+    @abstractmethod
+    def generate(self, prompt: str, timeout: float) -> Completion:
+        ...
+
+    async def generate_async(self, prompt: str, timeout: float) -> Completion:
+        return await asyncio.to_thread(self.generate, prompt, timeout)
+
+    async def stream(self, prompt: str, timeout: float):
+        completion = await self.generate_async(prompt, timeout)
+        yield completion.text
+
+    def record(self, seconds: float, prompt_tokens=0, completion_tokens=0, outcome="ok"):
+        with self._stats_lock:
+            self.stats["calls"] += 1
+            if outcome == "error":
+                self.stats["errors"] += 1
+            elif outcome == "timeout":
+                self.stats["timeouts"] += 1
+            self.stats["latency_seconds_total"] += seconds
+            self.stats["latency_seconds_max"] = max(self.stats["latency_seconds_max"], seconds)
+            self.stats["prompt_tokens"] += prompt_tokens
+            self.stats["completion_tokens"] += completion_tokens
+        metrics.llm_requests.inc(self.name, outcome)
+        metrics.llm_request_duration.observe(seconds, self.name)
+        if prompt_tokens:
+            metrics.llm_tokens.inc(self.name, "prompt", amount=prompt_tokens)
+        if completion_tokens:
+            metrics.llm_tokens.inc(self.name, "completion", amount=completion_tokens)
+
+    def get_stats(self):
+        with self._stats_lock:
+            stats = dict(self.stats)
+        calls = stats["calls"]
+        stats["latency_ms_avg"] = round(stats["latency_seconds_total"] * 1000 / calls, 2) if calls else 0.0
+        stats["latency_ms_max"] = round(stats.pop("latency_seconds_max") * 1000, 2)
+        stats.pop("latency_seconds_total")
+        return stats
+
+
+# ------------------ GEMINI ------------------
+def extract_text(response) -> str:
+    if hasattr(response, "text") and response.text:
+        return response.text.strip()
+    elif hasattr(response, "candidates") and len(response.candidates) > 0:
+        part = response.candidates[0].content.parts
+        if part and len(part) > 0:
+            return part[0].text.strip()
+
+    return EMPTY_REPLY
+
+
+def chunk_text(chunk) -> str:
+    # .text raises ValueError on chunks without text parts (e.g. safety stops)
+    try:
+        return chunk.text
+    except ValueError:
+        return ""
+
+
+def gemini_completion(prompt: str, response) -> Completion:
+    text = extract_text(response)
+    usage = getattr(response, "usage_metadata", None)
+    if usage and usage.prompt_token_count:
+        return Completion(text, usage.prompt_token_count, usage.candidates_token_count or 0)
+    return Completion(text, estimate_tokens(prompt), estimate_tokens(text))
+
+
+def get_available_model(preferred_model=None):
+    """Tries preferred model, falls back to first available generative model."""
+    import google.generativeai as genai
+
+    preferred_model = preferred_model or os.getenv("GEMINI_MODEL", "gemini-1.5")
+    try:
+        # Try preferred model first
+        model = genai.GenerativeModel(preferred_model)
+        logger.info("Using preferred model: %s", preferred_model)
+        return model
+    except Exception as e:
+        logger.warning("Preferred model not available: %s", e)
+        # List all available models
+        available_models = genai.list_models()
+        for m in available_models:
+            if "generateContent" in m.available_methods:
+                logger.info("Using fallback model: %s", m.name)
+                return genai.GenerativeModel(m.name)
+        raise RuntimeError("❌ No available generative model found.")
+
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+
+    def __init__(self):
+        super().__init__()
+        self.model = None
+        self.resolved = False
+        self._lock = threading.Lock()
+
+    def is_available(self) -> bool:
+        """Resolve the model once per worker; without a key, stay unavailable."""
+        if self.model is not None or self.resolved:
+            return self.model is not None
+        with self._lock:
+            if self.model is not None or self.resolved:
+                return self.model is not None
+            # Read here, not at import, so backend/.env has been loaded.
+            api_key = os.getenv("GOOGLE_API_KEY")
+            if not api_key:
+                logger.error("❌ GOOGLE_API_KEY missing in .env file; AI replies are disabled")
+                self.resolved = True
+                return False
+            try:
+                # The SDK import alone is most of a worker's boot time, so it
+                # happens here rather than at module level.
+                import google.generativeai as genai
+
+                genai.configure(api_key=api_key)
+                self.model = get_available_model()
+            except Exception as e:
+                # Left unresolved so the next call retries.
+                logger.error("Gemini model resolution failed: %s", e)
+                return False
+            self.resolved = True
+            return True
+
+    def generate(self, prompt: str, timeout: float) -> Completion:
+        response = self.model.generate_content(prompt, request_options={"timeout": timeout})
+        logger.debug("Raw Gemini response: %s", response)
+        return gemini_completion(prompt, response)
+
+    async def generate_async(self, prompt: str, timeout: float) -> Completion:
+        response = await self.model.generate_content_async(prompt, request_options={"timeout": timeout})
+        logger.debug("Raw Gemini response: %s", response)
+        return gemini_completion(prompt, response)
+
+    async def stream(self, prompt: str, timeout: float):
+        response = await self.model.generate_content_async(
+            prompt, stream=True, request_options={"timeout": timeout}
+        )
+        async for chunk in response:
+            text = chunk_text(chunk)
+            if text:
+                yield text
+
+
+# ------------------ LOCAL CPU MODEL ------------------
+class LocalProvider(LLMProvider):
+    """llama.cpp (.gguf path) or transformers model running in-process on CPU."""
+
+    name = "local"
+
+    def __init__(self, model_name: str = LOCAL_LLM_MODEL):
+        super().__init__()
+        self.model_name = model_name
+        self.llama = None
+        self.pipeline = None
+        self.resolved = False
+        self._lock = threading.Lock()
+        # CPU inference is neither thread-safe nor faster in parallel.
+        self._generate_lock = threading.Lock()
+
+    def is_available(self) -> bool:
+        if self.resolved:
+            return self.llama is not None or self.pipeline is not None
+        with self._lock:
+            if not self.resolved:
+                try:
+                    if self.model_name.endswith(".gguf"):
+                        from llama_cpp import Llama
+
+                        self.llama = Llama(model_path=self.model_name, n_ctx=4096, verbose=False)
+                    else:
+                        from transformers import pipeline
+
+                        self.pipeline = pipeline("text-generation", model=self.model_name, device="cpu")
+                    logger.info("Loaded local model: %s", self.model_name)
+                except ImportError as e:
+                    logger.error("Local LLM backend not installed (%s); install llama-cpp-python or transformers", e)
+                except Exception as e:
+                    logger.error("Could not load local model %s: %s", self.model_name, e)
+                self.resolved = True
+        return self.llama is not None or self.pipeline is not None
+
+    def generate(self, prompt: str, timeout: float) -> Completion:
+        # timeout is enforced by the caller; a running CPU generation can't be interrupted.
+        with self._generate_lock:
+            if self.llama is not None:
+                out = self.llama(prompt, max_tokens=LOCAL_LLM_MAX_NEW_TOKENS)
+                text = out["choices"][0]["text"].strip() or EMPTY_REPLY
+                usage = out.get("usage", {})
+                return Completion(text, usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0))
+
+            out = self.pipeline(
+                prompt,
+                max_new_tokens=LOCAL_LLM_MAX_NEW_TOKENS,
+                return_full_text=False,
+                do_sample=False,
+            )
+            text = out[0]["generated_text"].strip() or EMPTY_REPLY
+            tokenizer = self.pipeline.tokenizer
+            return Completion(text, len(tokenizer.encode(prompt)), len(tokenizer.encode(text)))
+
+
+# ------------------ STUB ------------------
+class StubProvider(LLMProvider):
+    """Deterministic offline replies: same prompt, same reply, same latency.
+
+    Latency is STUB_LLM_LATENCY_SECONDS plus, if STUB_LLM_TOKENS_PER_SECOND
+    is set, one token interval per reply token (streamed word by word).
+    """
+
+    name = "stub"
+
+    def __init__(self, latency: float = STUB_LLM_LATENCY_SECONDS, tokens_per_second: float = STUB_LLM_TOKENS_PER_SECOND):
+        super().__init__()
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+
+    def reply(self, prompt: str) -> str:
+        user_message = prompt.rsplit("User:", 1)[-1].strip()
+        digest = hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8]
+        return f"Stub reply {digest}: you said \"{user_message[:200]}\""
+
+    def token_delay(self) -> float:
+        return 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def completion(self, prompt: str) -> Completion:
+        text = self.reply(prompt)
+        return Completion(text, estimate_tokens(prompt), estimate_tokens(text))
+
+    def generate(self, prompt: str, timeout: float) -> Completion:
+        completion = self.completion(prompt)
+        time.sleep(self.latency + completion.completion_tokens * self.token_delay())
+        return completion
+
+    async def generate_async(self, prompt: str, timeout: float) -> Completion:
+        completion = self.completion(prompt)
+        await asyncio.sleep(self.latency + completion.completion_tokens * self.token_delay())
+        return completion
+
+    async def stream(self, prompt: str, timeout: float):
+        await asyncio.sleep(self.latency)
+        words = self.reply(prompt).split(" ")
+        delay = self.token_delay()
+        for i, word in enumerate(words):
+            if delay:
+                await asyncio.sleep(delay * estimate_tokens(word + " "))
+            yield word if i == len(words) - 1 else word + " "
+
+
+# ------------------ REGISTRY ------------------
+PROVIDER_CLASSES = {
+    "gemini": GeminiProvider,
+    "local": LocalProvider,
+    "stub": StubProvider,
+}
+
+providers = {}
+providers_lock = threading.Lock()
+
+
+def get_provider(name: str = None) -> LLMProvider:
+    """The shared provider instance for name (default LLM_PROVIDER)."""
+    name = name or PROVIDER
+    provider = providers.get(name)
+    if provider is None:
+        if name not in PROVIDER_CLASSES:
+            raise ValueError(f"Unknown LLM provider {name!r}; expected one of {', '.join(PROVIDER_CLASSES)}")
+        with providers_lock:
+            provider = providers.setdefault(name, PROVIDER_CLASSES[name]())
+    return provider
+
+
+def select(message: str):
+    """Available provider for this chat message, or None if none can answer.
+
+    FAQ-style intents go to LLM_CHEAP_PROVIDER when it is set and loads,
+    everything else (and cheap intents it can't take) to LLM_PROVIDER. May
+    load a client or model on first use, so async callers run it in a thread.
+    """
+    if CHEAP_PROVIDER and classify_faq(normalize(message)) is not None:
+        cheap = get_provider(CHEAP_PROVIDER)
+        if cheap.is_available():
+            return cheap
+    provider = get_provider()
+    return provider if provider.is_available() else None
+
+
+def warm_up():
+    """Resolve the configured providers (called from the app's startup hook)."""
+    for name in {PROVIDER, CHEAP_PROVIDER or PROVIDER}:
+        get_provider(name).is_available()
+
+
+def get_stats():
+    return {name: provider.get_stats() for name, provider in list(providers.items())}
@@ -1,16 +1,30 @@
-from typing import List
-from fastapi import FastAPI, Depends, HTTPException
+from datetime import date, datetime, timedelta
+from typing import List, Literal, Optional, Union
+from fastapi import FastAPI, Depends, Header, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from . import crud, models, schemas, chatbot
-from .database import engine, SessionLocal
+from . import crud, schemas, chatbot, menu_cache, response_cache, llm_providers, prompts, intents, metrics, versions, events, tracking_cache, kitchen_queue, exports, fast_json, idempotency
+from .database import SessionLocal, engine
+from contextlib import asynccontextmanager
+import asyncio
 import logging
+import json
+import os
 
-# Create tables
-models.Base.metadata.create_all(bind=engine)
+# The schema is set up once, outside the workers: `python -m backend.migrations`.
+# Startup only resolves the LLM provider(s) in the background; nothing on the import
+# path talks to the network or the database.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    model_warmup = asyncio.create_task(asyncio.to_thread(llm_providers.warm_up))
+    yield
+    model_warmup.cancel()
+    if version_watcher is not None:
+        version_watcher.cancel()
 
-app = FastAPI(title="Restaurant AI Chatbot API")
+app = FastAPI(title="Restaurant AI Chatbot API", lifespan=lifespan)
 
 # CORS
 app.add_middleware(
@@ -19,7 +33,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
+app.add_middleware(metrics.MetricsMiddleware)
+metrics.instrument_pool(engine)
 
 # Dependency
 def get_db():
@@ -29,6 +46,20 @@ def get_db():
     finally:
         db.close()
 
+# Conditional GET for polling endpoints. Tags come from the shared version
+# rows, so answering 304 costs one primary-key lookup (none for the menu).
+def etag_for(name: str, *parts) -> str:
+    return 'W/"' + "-".join(str(p) for p in (name, *parts)) + '"'
+
+def not_modified(request: Request, response: Response, etag: str, cache_control: str = "no-cache"):
+    """Set ETag headers; return a 304 response if the client already has etag."""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    response.headers.update(headers)
+    candidates = [t.strip() for t in request.headers.get("if-none-match", "").split(",")]
+    if etag in candidates or "*" in candidates:
+        return Response(status_code=304, headers=headers)
+    return None
+
 @app.get("/")
 def read_root():
     return {"message": "Restaurant AI Chatbot Backend is Running"}
@@ -39,7 +70,13 @@ def create_menu_item(menu: schemas.MenuCreate, db: Session = Depends(get_db)):
     return crud.create_menu_item(db=db, menu=menu)
 
 @app.get("/menu/", response_model=List[schemas.Menu])
-def read_menu(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_menu(request: Request, response: Response, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    etag = etag_for("menu", menu_cache.get_snapshot(db).version, skip, limit)
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    if fast_json.ENABLED:
+        return fast_json.respond(crud.get_menu_rows(db, skip=skip, limit=limit), response)
     return crud.get_menu(db, skip=skip, limit=limit)
 
 @app.delete("/menu/{item_id}")
@@ -51,13 +88,80 @@ def delete_menu_item(item_id: int, db: Session = Depends(get_db)):
 
 # Category Endpoints
 @app.get("/categories", response_model=List[schemas.Category])
-def read_categories(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_categories(request: Request, response: Response, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    etag = etag_for("categories", menu_cache.get_snapshot(db).version, skip, limit)
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    if fast_json.ENABLED:
+        return fast_json.respond(crud.get_category_rows(db, skip=skip, limit=limit), response)
     return crud.get_categories(db, skip=skip, limit=limit)
 
 @app.post("/categories", response_model=schemas.Category)
 def create_category(category: schemas.CategoryCreate, db: Session = Depends(get_db)):
     return crud.create_category(db=db, category=category)
 
+# Cache Stats Endpoint
+@app.get("/cache/stats")
+def get_cache_stats():
+    return {
+        "menu": menu_cache.get_stats(),
+        "conversations": chatbot.conversation_store.get_stats(),
+        "llm_responses": response_cache.get_stats(),
+        "tracking": tracking_cache.get_stats(),
+        "idempotency": idempotency.get_stats(),
+    }
+
+# LLM Stats Endpoint
+@app.get("/llm/stats")
+def get_llm_stats():
+    """Per-provider calls, errors, timeouts, latency and tokens, prompt sizes,
+    and how many chat messages the intent router answered without the LLM."""
+    return {
+        "provider": llm_providers.PROVIDER,
+        "cheap_provider": llm_providers.CHEAP_PROVIDER or None,
+        "providers": llm_providers.get_stats(),
+        "prompts": prompts.get_stats(),
+        "router": intents.get_stats(),
+    }
+
+# Metrics Endpoint
+def collect_app_metrics():
+    menu = menu_cache.get_stats()
+    llm_responses = response_cache.get_stats()
+    caches = {"menu": menu, "llm_responses": llm_responses, "tracking": tracking_cache.get_stats()}
+    pool = engine.pool
+    return [
+        ("chats_in_flight", "gauge", "Chat requests being processed (/chat/ and /chat/stream)",
+         [({}, chats_in_flight)]),
+        ("cache_hits_total", "counter", "Cache lookups answered from the cache",
+         [({"cache": name}, stats["hits"]) for name, stats in caches.items()]),
+        ("cache_misses_total", "counter", "Cache lookups that missed",
+         [({"cache": name}, stats["misses"]) for name, stats in caches.items()]),
+        ("cache_hit_ratio", "gauge", "hits / (hits + misses) since the worker started",
+         [({"cache": name}, round(stats["hits"] / max(1, stats["hits"] + stats["misses"]), 4))
+          for name, stats in caches.items()]),
+        ("conversation_sessions", "gauge", "Chat sessions held by the conversation store",
+         [({}, chatbot.conversation_store.get_stats()["sessions"])]),
+        ("chat_router_messages_total", "counter", "Chat messages seen by the intent router",
+         [({}, intents.stats["messages"])]),
+        ("chat_router_answered_total", "counter", "Chat messages answered without the LLM, by intent",
+         [({"intent": name}, counts["answered"]) for name, counts in intents.intent_stats.items()]),
+        ("kitchen_queue_depth", "gauge", "Active orders in the kitchen queue, by status",
+         [({"status": status}, count) for status, count in kitchen_queue.queue.get_stats()["depth"].items()]),
+        ("idempotent_replays_total", "counter", "Retried requests answered with the stored result, by store",
+         [({"store": name}, stats["replayed"]) for name, stats in idempotency.get_stats().items()]),
+        ("db_pool_checked_out", "gauge", "Database connections currently in use",
+         [({}, pool.checkedout())] if hasattr(pool, "checkedout") else []),
+    ]
+
+metrics.register_collector(collect_app_metrics)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus text exposition of this worker's metrics."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 # Restaurant Info Endpoints
 @app.get("/restaurant-info", response_model=schemas.Restaurant)
 def get_restaurant_info(db: Session = Depends(get_db)):
@@ -79,27 +183,201 @@ def update_restaurant_info(info: schemas.RestaurantCreate, db: Session = Depends
     return crud.create_restaurant_info(db=db, info=info)
 
 # Order Endpoints
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+def idempotency_http_error(e: idempotency.IdempotencyError) -> HTTPException:
+    return HTTPException(status_code=e.status_code, detail=str(e), headers=e.headers)
+
+def run_idempotent(response: Response, scope: str, key: Optional[str], payload, fn):
+    """fn() once per Idempotency-Key; retries get its stored result back, marked with REPLAYED_HEADER."""
+    if not key:
+        return fn()
+    try:
+        result, replayed = idempotency.run(idempotency.keys, (scope, key), idempotency.fingerprint(payload), fn)
+    except idempotency.IdempotencyError as e:
+        raise idempotency_http_error(e)
+    if replayed:
+        response.headers[REPLAYED_HEADER] = "true"
+    return result
+
 @app.post("/orders/", response_model=schemas.Order)
-def create_order(order: schemas.OrderCreate, db: Session = Depends(get_db)):
-    return crud.create_order(db=db, order=order)
+def create_order(
+    order: schemas.OrderCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+):
+    """Place an order. Send an Idempotency-Key header to make retries safe:
+    a repeat with the same key returns the first order instead of a new one."""
+    return run_idempotent(
+        response, "orders", idempotency_key, order.model_dump(),
+        lambda: schemas.Order.model_validate(crud.create_order(db=db, order=order)).model_dump(mode="json"),
+    )
 
-@app.get("/orders/", response_model=List[schemas.Order])
-def read_orders(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_orders(db, skip=skip, limit=limit)
+@app.post("/orders/bulk", response_model=List[schemas.Order])
+def create_orders_bulk(
+    bulk: schemas.OrderBulkCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+):
+    """Create many orders in one transaction (kiosk / offline-sync uploads).
+    Idempotency-Key works as for POST /orders/."""
+    return run_idempotent(
+        response, "orders/bulk", idempotency_key, bulk.model_dump(),
+        lambda: [schemas.Order.model_validate(o).model_dump(mode="json")
+                 for o in crud.create_orders(db=db, orders=bulk.orders)],
+    )
+
+@app.get("/orders/", response_model=Union[List[schemas.Order], List[schemas.OrderSummary]])
+def read_orders(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    fields: Literal["full", "summary"] = "full",
+    db: Session = Depends(get_db),
+):
+    """List orders newest first.
+
+    Pass the X-Next-Cursor header of one page as ?cursor= to fetch the next
+    one; fields=summary returns order headers without line items.
+    """
+    filters = dict(cursor=cursor, status=status, created_from=created_from, created_to=created_to)
+    # Full orders embed menu items, so a menu edit changes them too.
+    menu_version = versions.get_version(db, menu_cache.MENU_VERSION) if fields == "full" else None
+    etag = etag_for("orders", versions.get_version(db, versions.ORDERS), menu_version, skip, limit, fields, *filters.values())
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+
+    try:
+        if fast_json.ENABLED:
+            headers = crud.get_order_summaries(db, skip=skip, limit=limit, **filters)
+            if len(headers) == limit:
+                response.headers["X-Next-Cursor"] = crud.encode_order_cursor(headers[-1])
+            rows = [h._asdict() for h in headers] if fields == "summary" else crud.get_order_rows(db, headers)
+            return fast_json.respond(rows, response)
+        if fields == "summary":
+            orders = crud.get_order_summaries(db, skip=skip, limit=limit, **filters)
+            orders = [schemas.OrderSummary.model_validate(o) for o in orders]
+        else:
+            orders = crud.get_orders(db, skip=skip, limit=limit, **filters)
+            orders = [schemas.Order.model_validate(o) for o in orders]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if len(orders) == limit:
+        response.headers["X-Next-Cursor"] = crud.encode_order_cursor(orders[-1])
+    return orders
+
+# Export Endpoints
+def export_response(chunks, name: str, format: str):
+    filename = f"{name}-{datetime.utcnow():%Y%m%d-%H%M%S}.{format}"
+    return StreamingResponse(
+        chunks,
+        media_type=exports.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@app.get("/orders/export")
+def export_orders(
+    format: Literal["csv", "ndjson"] = "csv",
+    status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    include_archived: bool = False,
+):
+    """Stream orders oldest first: CSV with one row per order line, or NDJSON
+    with one object per order and its items nested."""
+    chunks = exports.export_orders(format, status, created_from, created_to, include_archived)
+    return export_response(chunks, "orders", format)
+
+@app.get("/analytics/export")
+def export_analytics(
+    format: Literal["csv", "ndjson"] = "csv",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    days: Optional[int] = Query(None, ge=1),
+):
+    """Stream daily per-item sales (day, item_id, item_name, quantity, income);
+    same window parameters as /analytics/."""
+    if days:
+        end = datetime.utcnow().date()
+        start = end - timedelta(days=days - 1)
+    return export_response(exports.export_analytics(format, start, end), "analytics", format)
 
 # Analytics Endpoint
 @app.get("/analytics/", response_model=List[dict])
-def get_analytics(db: Session = Depends(get_db)):
-    return crud.get_analytics_data(db)
+def get_analytics(
+    request: Request,
+    response: Response,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    days: Optional[int] = Query(None, ge=1),
+    db: Session = Depends(get_db),
+):
+    """Sales per item from the daily rollups.
+
+    Window: start/end dates (inclusive), or days for the last N days
+    including today (UTC). No window means all time.
+    """
+    if days:
+        end = datetime.utcnow().date()
+        start = end - timedelta(days=days - 1)
+    etag = etag_for("analytics", versions.get_version(db, versions.ORDERS), start, end)
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    return crud.get_analytics_data(db, start=start, end=end)
 
 # Order Statistics Endpoint
 @app.get("/orders/statistics")
-def get_order_stats(db: Session = Depends(get_db)):
+def get_order_stats(request: Request, response: Response, db: Session = Depends(get_db)):
+    etag = etag_for("statistics", versions.get_version(db, versions.ORDERS))
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
     return crud.get_order_statistics(db)
 
+# Kitchen Queue Endpoint
+@app.get("/kitchen/queue")
+def get_kitchen_queue(request: Request, response: Response, db: Session = Depends(get_db)):
+    """Active orders (Pending, Preparing, Ready) oldest first, with their items,
+    plus queue depth and recent average wait/prep/handoff times."""
+    current = kitchen_queue.queue.get_queue(db)
+    etag = etag_for("kitchen", current["version"])
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    return {**current, "stats": kitchen_queue.queue.get_stats()}
+
+# Order Tracking Endpoint
+@app.get("/orders/track/{code}", response_model=schemas.OrderTracking)
+def track_order(code: str, request: Request, response: Response, db: Session = Depends(get_db)):
+    """Status of an order by tracking code, for customers polling it.
+
+    Served from tracking_cache; clients may reuse a response for
+    TRACKING_CACHE_TTL seconds and revalidate it with If-None-Match.
+    """
+    status = tracking_cache.get_status(db, code)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Order not found")
+    cached = not_modified(request, response, status.etag, f"max-age={int(tracking_cache.TTL_SECONDS)}")
+    if cached:
+        return cached
+    return status._asdict()
+
 @app.put("/orders/{order_id}/status", response_model=schemas.Order)
 def update_order_status(order_id: int, status: schemas.OrderUpdateStatus, db: Session = Depends(get_db)):
-    db_order = crud.update_order_status(db, order_id=order_id, status=status.order_status)
+    try:
+        db_order = crud.update_order_status(db, order_id=order_id, status=status.order_status)
+    except kitchen_queue.InvalidTransition as e:
+        raise HTTPException(status_code=409, detail=str(e))
     if db_order is None:
         raise HTTPException(status_code=404, detail="Order not found")
     return db_order
@@ -118,13 +396,222 @@ class ChatRequest(BaseModel):
 
 logger = logging.getLogger("uvicorn.error")
 
+# Chats admitted at once per worker; beyond this we shed load with 429
+# rather than letting requests pile up behind slow LLM calls.
+CHAT_MAX_IN_FLIGHT = int(os.getenv("CHAT_MAX_IN_FLIGHT", "64"))
+chats_in_flight = 0
+
+class ChatSlot:
+    """One admitted chat, counted in chats_in_flight until released.
+
+    The check and the increment run without an await in between, so
+    concurrent requests cannot all pass the check before any of them counts.
+    """
+
+    def __init__(self):
+        global chats_in_flight
+        if chats_in_flight >= CHAT_MAX_IN_FLIGHT:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many chat requests, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        chats_in_flight += 1
+        self.held = True
+
+    def release(self):
+        global chats_in_flight
+        if self.held:
+            self.held = False
+            chats_in_flight -= 1
+
+class ChatStreamResponse(StreamingResponse):
+    """Releases the stream's chat slot however the response ends, including
+    when the client is gone before the body generator ever runs."""
+
+    def __init__(self, content, slot, **kwargs):
+        super().__init__(content, **kwargs)
+        self.slot = slot
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            if self.slot is not None:
+                self.slot.release()
+
 @app.post("/chat/")
-def chat(request: ChatRequest, db: Session = Depends(get_db)):
+async def chat(request: ChatRequest, response: Response, idempotency_key: Optional[str] = Header(None)):
+    """Reply to a chat message. A retry (same Idempotency-Key, or the same message
+    in the same session within CHAT_DEDUP_WINDOW_SECONDS) gets the first reply
+    back without running the chatbot again."""
+    dedup = idempotency.chat_request(request.session_id, request.message, idempotency_key)
+    if dedup is None:
+        reply, _ = await answer_chat(request)
+        return {"response": reply}
+    store, key, fingerprint = dedup
+    # The store holds the reply text, as /chat/stream's does; only answers
+    # are kept, so a retry of a failed turn runs again.
+    status = {}
+
+    async def run():
+        reply, status["ok"] = await answer_chat(request)
+        return reply
+
+    try:
+        reply, replayed = await idempotency.run_async(
+            store, key, fingerprint, run, keep=lambda reply: status["ok"]
+        )
+    except idempotency.IdempotencyError as e:
+        raise idempotency_http_error(e)
+    if replayed:
+        response.headers[REPLAYED_HEADER] = "true"
+    return {"response": reply}
+
+async def answer_chat(request: ChatRequest):
+    """(reply, ok) from chatbot.process_chat_message_async, as HTTP errors when it fails."""
+    slot = ChatSlot()
     try:
-        logger.debug(f"Received chat request: {request}")
-        response = chatbot.process_chat_message(request.message, db, request.session_id)
-        logger.debug(f"Chat response: {response}")
-        return {"response": response}
+        logger.debug("Received chat request: %s", request)
+        reply, ok = await chatbot.process_chat_message_async(request.message, request.session_id)
+        logger.debug("Chat response: %s", reply)
+        return reply, ok
+    except chatbot.LLMOverloaded as e:
+        logger.warning("Chat rejected, LLM overloaded: %s", e)
+        raise HTTPException(
+            status_code=503,
+            detail="AI assistant is busy, please retry shortly",
+            headers={"Retry-After": "2"},
+        )
     except Exception as e:
-        logger.error(f"Error processing chat request: {e}")
+        logger.error("Error processing chat request: %s", e)
         raise HTTPException(status_code=500, detail="Internal Server Error")
+    finally:
+        slot.release()
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest, idempotency_key: Optional[str] = Header(None)):
+    """Server-Sent Events version of /chat/.
+
+    Emits `chunk` events ({"text": ...}) as the reply is generated, then a
+    final `done` event with the full response, or an `error` event.
+    Retries are deduplicated as for /chat/; a replay is one chunk plus a
+    done event with "replayed": true.
+    """
+    dedup = idempotency.chat_request(request.session_id, request.message, idempotency_key)
+    existing = None
+    if dedup is not None:
+        store, key, fingerprint = dedup
+        try:
+            existing = store.peek(key, fingerprint)
+        except idempotency.IdempotencyError as e:
+            raise idempotency_http_error(e)
+    # Admitted here, so an overloaded worker still answers 429, and counted
+    # from now on; a replay of a finished reply takes no slot.
+    slot = ChatSlot() if existing is None else None
+
+    async def replay(entry):
+        try:
+            reply = await idempotency.wait_async(store, entry)
+        except idempotency.StillRunning as e:
+            yield sse_event("error", {"detail": str(e)})
+            return
+        if reply is None:
+            yield sse_event("error", {"detail": "The original request failed, please retry"})
+            return
+        yield sse_event("chunk", {"text": reply})
+        yield sse_event("done", {"response": reply, "replayed": True})
+
+    async def events():
+        nonlocal slot
+        # The entry is claimed here, not in the endpoint, so a client that
+        # disconnects before the stream starts leaves nothing pending.
+        entry = None
+        try:
+            if dedup is not None:
+                entry, owner = store.begin(key, fingerprint)
+                if not owner:
+                    if slot is not None:
+                        slot.release()
+                    async for event in replay(entry):
+                        yield event
+                    return
+            if slot is None:
+                # The entry peeked at in the endpoint is gone (expired or
+                # failed), so this request runs after all.
+                slot = ChatSlot()
+        except idempotency.IdempotencyError as e:
+            if slot is not None:
+                slot.release()
+            yield sse_event("error", {"detail": str(e)})
+            return
+        except HTTPException as e:
+            store.abandon(key, entry)
+            yield sse_event("error", {"detail": e.detail})
+            return
+
+        parts = []
+        status = {}
+        try:
+            async for chunk in chatbot.stream_chat_message(request.message, request.session_id, status):
+                parts.append(chunk)
+                yield sse_event("chunk", {"text": chunk})
+            reply = "".join(parts).strip()
+            if entry is not None:
+                # A stream that failed part way ends with an error message
+                # after partial text; only a clean one is replayed.
+                store.complete(key, entry, reply, status.get("ok", False))
+            yield sse_event("done", {"response": reply})
+        except chatbot.LLMOverloaded as e:
+            logger.warning("Chat stream rejected, LLM overloaded: %s", e)
+            yield sse_event("error", {"detail": "AI assistant is busy, please retry shortly"})
+        except Exception as e:
+            logger.error("Error streaming chat response: %s", e)
+            yield sse_event("error", {"detail": "Internal Server Error"})
+        finally:
+            slot.release()
+            if entry is not None and not entry.done.is_set():
+                # Failed or the client went away: let a retry run again.
+                store.abandon(key, entry)
+
+    return ChatStreamResponse(events(), slot, media_type="text/event-stream", headers=SSE_HEADERS)
+
+# Event Stream Endpoint
+EVENTS_KEEPALIVE_SECONDS = 15
+version_watcher = None
+
+@app.get("/events")
+async def stream_events():
+    """Server-Sent Events for dashboards: order and menu changes as they happen.
+
+    Event names: order_created, order_status_changed, order_deleted,
+    menu_changed, plus orders_changed for writes made by other workers.
+    """
+    global version_watcher
+    if version_watcher is None or version_watcher.done():
+        version_watcher = asyncio.create_task(events.watch_versions())
+
+    async def stream():
+        queue = events.broker.subscribe()
+        try:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield sse_event(event, data)
+        finally:
+            events.broker.unsubscribe(queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,102 @@
+import os
+import threading
+import time
+from functools import cached_property
+from sqlalchemy.orm import Session
+from . import models, schemas, versions, menu_index
+
+# In-process snapshot of the menu, categories and restaurant info.
+#
+# The menu changes a few times a day but is read on every chat message and
+# dashboard poll, so readers share one immutable snapshot instead of querying
+# SQLite. Writes in this process invalidate it directly (crud calls
+# invalidate() after commit). Other uvicorn workers notice through the "menu"
+# row in cache_versions, which is checked at most once per
+# MENU_CACHE_CHECK_INTERVAL seconds.
+
+MENU_VERSION = "menu"
+CHECK_INTERVAL_SECONDS = float(os.getenv("MENU_CACHE_CHECK_INTERVAL", "1"))
+
+
+class MenuSnapshot:
+    """Read-only view of the menu tables at one version."""
+
+    def __init__(self, version, items, categories, restaurant):
+        self.version = version
+        self.items = tuple(items)
+        self.categories = tuple(categories)
+        self.restaurant = restaurant
+        self.by_id = {item.id: item for item in self.items}
+
+    @cached_property
+    def index(self):
+        """Fuzzy name index, built on first use for this version only."""
+        return menu_index.MenuIndex(self.items)
+
+    @cached_property
+    def item_rows(self):
+        """Items as plain dicts for fast_json, built once per version."""
+        return [item.model_dump() for item in self.items]
+
+    @cached_property
+    def category_rows(self):
+        return [category.model_dump() for category in self.categories]
+
+
+_snapshot = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def load_snapshot(db: Session, version: int) -> MenuSnapshot:
+    items = db.query(models.Menu).order_by(models.Menu.id).all()
+    categories = db.query(models.Category).order_by(models.Category.name).all()
+    restaurant = db.query(models.Restaurant).first()
+    return MenuSnapshot(
+        version=version,
+        items=[schemas.Menu.model_validate(i) for i in items],
+        categories=[schemas.Category.model_validate(c) for c in categories],
+        restaurant=schemas.Restaurant.model_validate(restaurant) if restaurant else None,
+    )
+
+
+def get_snapshot(db: Session) -> MenuSnapshot:
+    global _snapshot, _checked_at
+    snapshot = _snapshot
+    if snapshot is not None and time.monotonic() - _checked_at < CHECK_INTERVAL_SECONDS:
+        stats["hits"] += 1
+        return snapshot
+
+    with _lock:
+        # Read the version before the rows: if a write lands in between, the
+        # snapshot is labelled older than its contents and simply gets
+        # rebuilt on the next check.
+        version = versions.get_version(db, MENU_VERSION)
+        snapshot = _snapshot
+        if snapshot is None or snapshot.version != version:
+            stats["misses"] += 1
+            snapshot = load_snapshot(db, version)
+            _snapshot = snapshot
+        else:
+            stats["hits"] += 1
+        _checked_at = time.monotonic()
+        return snapshot
+
+
+def invalidate():
+    """Drop the snapshot after a menu write committed in this process."""
+    global _snapshot
+    with _lock:
+        _snapshot = None
+        stats["invalidations"] += 1
+
+
+def get_stats():
+    snapshot = _snapshot
+    return {
+        **stats,
+        "version": snapshot.version if snapshot else None,
+        "items": len(snapshot.items) if snapshot else 0,
+    }
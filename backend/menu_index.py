@@ -0,0 +1,74 @@
+import re
+from collections import defaultdict
+from rapidfuzz import fuzz, process
+
+# Prebuilt fuzzy-match index over menu item names.
+#
+# Built once per menu snapshot (see MenuSnapshot.index). Small menus are
+# scored in one rapidfuzz batch call; large menus first narrow the choices
+# to items sharing a character trigram with the message.
+
+PREFILTER_MIN_ITEMS = 200
+NGRAM_SIZE = 3
+
+_non_word = re.compile(r"[^\w]+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase, turn punctuation into spaces and collapse whitespace."""
+    return " ".join(_non_word.sub(" ", text.lower()).split())
+
+
+def ngrams(text: str, n: int = NGRAM_SIZE):
+    # Spaces are dropped so "7 up" still shares grams with "7up".
+    compact = text.replace(" ", "")
+    if len(compact) <= n:
+        return {compact} if compact else set()
+    return {compact[i:i + n] for i in range(len(compact) - n + 1)}
+
+
+class MenuIndex:
+    """Normalized names plus a trigram -> item postings table."""
+
+    def __init__(self, items):
+        self.items = tuple(items)
+        self.names = [normalize(item.item) for item in self.items]
+        self.postings = defaultdict(list)
+        for position, name in enumerate(self.names):
+            for gram in ngrams(name):
+                self.postings[gram].append(position)
+
+    def candidates(self, normalized_message: str):
+        """Positions worth scoring, or None to score every item."""
+        if len(self.items) < PREFILTER_MIN_ITEMS:
+            return None
+        positions = set()
+        for gram in ngrams(normalized_message):
+            positions.update(self.postings.get(gram, ()))
+        return sorted(positions)
+
+    def search(self, message: str, threshold: int = 70, limit=None, scorer=fuzz.partial_ratio):
+        """Return [(item, score)] for names matching the message, best first.
+
+        Scores are fuzz.partial_ratio of name vs. message unless another
+        rapidfuzz scorer is given; ties keep menu order.
+        """
+        msg = normalize(message)
+        if not msg or not self.items:
+            return []
+
+        positions = self.candidates(msg)
+        if positions is None:
+            choices = self.names
+        else:
+            choices = [self.names[p] for p in positions]
+
+        matches = process.extract(
+            msg, choices, scorer=scorer,
+            score_cutoff=threshold, limit=limit,
+        )
+        results = []
+        for _, score, choice_index in matches:
+            position = choice_index if positions is None else positions[choice_index]
+            results.append((self.items[position], score))
+        return results
@@ -0,0 +1,240 @@
+import bisect
+import threading
+import time
+
+# In-process metrics in the Prometheus text format (GET /metrics).
+#
+# A deliberately small registry instead of prometheus_client: counters,
+# gauges and fixed-bucket histograms keyed by label tuples, each guarded by
+# its own lock, so recording a sample costs well under a microsecond.
+# Values that already live elsewhere (cache counters, pool size, chats in
+# flight) are read at scrape time through register_collector().
+#
+# Counters are per worker process; with several uvicorn workers each scrape
+# sees the worker that answered it.
+
+# Seconds; fine enough at the low end for in-process chat stages.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+registry = []
+collectors = []
+
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labelnames, labels, extra=()):
+    pairs = list(zip(labelnames, labels)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label(value)}"' for name, value in pairs) + "}"
+
+
+def format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self._lock = threading.Lock()
+        registry.append(self)
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self):
+        with self._lock:
+            values = list(self.values.items())
+        for labels, value in values:
+            yield f"{self.name}{format_labels(self.labelnames, labels)} {format_value(value)}"
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value, *labels):
+        with self._lock:
+            self.values[labels] = value
+
+
+class Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.series = {}  # labels -> [per-bucket counts (last is +Inf), sum, count]
+        self._lock = threading.Lock()
+        registry.append(self)
+
+    def observe(self, value: float, *labels):
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][position] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, *labels) -> Timer:
+        """Context manager observing the duration of its block."""
+        return Timer(self, labels)
+
+    def render(self):
+        with self._lock:
+            series = [(labels, (list(s[0]), s[1], s[2])) for labels, s in self.series.items()]
+        for labels, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = format_labels(self.labelnames, labels, [("le", format_value(bound))])
+                yield f"{self.name}_bucket{le} {cumulative}"
+            yield f"{self.name}_sum{format_labels(self.labelnames, labels)} {format_value(total)}"
+            yield f"{self.name}_count{format_labels(self.labelnames, labels)} {count}"
+
+
+def register_collector(collect):
+    """collect() -> [(name, type, help, [(labels dict, value)])], called per scrape."""
+    collectors.append(collect)
+
+
+def render() -> str:
+    lines = []
+    for metric in registry:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        lines.extend(metric.render())
+    for collect in collectors:
+        for name, metric_type, help, samples in collect():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples:
+                lines.append(f"{name}{format_labels(labels.keys(), labels.values())} {format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# ------------------ METRICS ------------------
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time from request to response headers, by route template",
+    ["method", "route", "status"],
+)
+chat_stage_duration = Histogram(
+    "chat_stage_duration_seconds",
+    "Time spent in each stage of a chat turn",
+    ["stage"],
+)
+llm_requests = Counter("llm_requests_total", "LLM calls by provider and outcome (ok, error, timeout)", ["provider", "outcome"])
+llm_request_duration = Histogram("llm_request_duration_seconds", "LLM call latency by provider", ["provider"])
+llm_tokens = Counter("llm_tokens_total", "LLM tokens by provider and kind (prompt, completion)", ["provider", "kind"])
+kitchen_stage_duration = Histogram(
+    "kitchen_stage_duration_seconds",
+    "Time orders spend waiting (Pending), in preparation (Preparing) and awaiting pickup (Ready)",
+    ["stage"],
+    buckets=(15, 30, 60, 120, 300, 600, 900, 1200, 1800, 2700, 3600, 7200),
+)
+db_pool_wait = Histogram(
+    "db_pool_wait_seconds",
+    "Time to get a database connection from the pool (including opening a new one)",
+)
+
+
+def instrument_pool(engine):
+    """Time every pool checkout of engine into db_pool_wait."""
+    pool = engine.pool
+    connect = pool.connect
+
+    def timed_connect():
+        start = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            db_pool_wait.observe(time.perf_counter() - start)
+
+    pool.connect = timed_connect
+
+
+# ------------------ MIDDLEWARE ------------------
+# Only touched from the event loop thread, so a plain int (no lock) will do.
+http_requests_in_flight = 0
+
+register_collector(lambda: [
+    ("http_requests_in_flight", "gauge", "HTTP requests being handled", [({}, http_requests_in_flight)]),
+])
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording http_request_duration_seconds per route.
+
+    Latency is measured to the start of the response, so streaming
+    endpoints (SSE) report time to first byte rather than stream length.
+    Unmatched paths share one "unmatched" label to bound cardinality.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global http_requests_in_flight
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        responded = False
+
+        async def send_with_metrics(message):
+            nonlocal responded
+            if not responded and message["type"] == "http.response.start":
+                responded = True
+                observe_request(scope, start, message["status"])
+            await send(message)
+
+        http_requests_in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        except Exception:
+            if not responded:
+                observe_request(scope, start, 500)
+            raise
+        finally:
+            http_requests_in_flight -= 1
+
+
+def observe_request(scope, start, status):
+    route = scope.get("route")
+    http_request_duration.observe(
+        time.perf_counter() - start,
+        scope["method"], route.path if route is not None else "unmatched", status,
+    )
@@ -0,0 +1,151 @@
+"""
+Schema migrations for existing databases.
+
+Run once per deploy, before starting the workers:
+
+    python -m backend.migrations
+
+New tables are created from the models; changes to tables that already
+exist (columns, indexes, backfills) are listed in MIGRATIONS and applied in
+order, each exactly once, recorded in schema_migrations.
+"""
+from datetime import datetime
+from sqlalchemy import inspect, text, insert
+from sqlalchemy.schema import CreateTable
+from .database import engine as default_engine
+from . import models, rollups
+
+ORDER_STATUSES = ["Pending", "Preparing", "Ready", "Completed", "Cancelled"]
+
+
+def add_tracking_code(conn):
+    """orders.tracking_code plus its unique index (replaces fix_db.py)."""
+    columns = [c["name"] for c in inspect(conn).get_columns("orders")]
+    if "tracking_code" not in columns:
+        conn.execute(text("ALTER TABLE orders ADD COLUMN tracking_code VARCHAR"))
+    for index in models.Order.__table__.indexes:
+        if index.name == "ix_orders_tracking_code":
+            index.create(conn, checkfirst=True)
+
+
+def add_order_status_created_at_indexes(conn):
+    for index in models.Order.__table__.indexes:
+        if index.name in ("ix_orders_order_status", "ix_orders_created_at"):
+            index.create(conn, checkfirst=True)
+
+
+def add_order_list_indexes(conn):
+    """Keyset pagination indexes and order_items.order_id for item loading."""
+    for index in models.Order.__table__.indexes:
+        if index.name in ("ix_orders_created_at_id", "ix_orders_status_created_at_id"):
+            index.create(conn, checkfirst=True)
+    for index in models.OrderItem.__table__.indexes:
+        if index.name == "ix_order_items_order_id":
+            index.create(conn, checkfirst=True)
+
+
+def add_unit_price_and_rollups(conn):
+    """Capture order_items.unit_price and build the item_daily_sales rollup.
+
+    Existing line items get the current menu price; that is the best
+    available record of what was charged.
+    """
+    columns = [c["name"] for c in inspect(conn).get_columns("order_items")]
+    if "unit_price" not in columns:
+        conn.execute(text("ALTER TABLE order_items ADD COLUMN unit_price FLOAT"))
+    conn.execute(text(
+        "UPDATE order_items SET unit_price ="
+        " (SELECT price FROM menu WHERE menu.id = order_items.item_id)"
+        " WHERE unit_price IS NULL"
+    ))
+    rollups.rebuild(conn)
+
+
+def rebuild_order_status_counts(conn):
+    """Recompute order_status_counts from the orders and orders_archive tables."""
+    counts = {}
+    for table in ("orders", "orders_archive"):
+        for status, count in conn.execute(
+            text(f"SELECT order_status, COUNT(*) FROM {table} GROUP BY order_status")
+        ):
+            counts[status] = counts.get(status, 0) + count
+    conn.execute(models.OrderStatusCount.__table__.delete())
+    rows = [{"status": s, "count": counts.pop(s, 0)} for s in ORDER_STATUSES]
+    rows += [{"status": s, "count": c} for s, c in counts.items() if s is not None]
+    conn.execute(insert(models.OrderStatusCount), rows)
+
+
+def autoincrement_order_ids(conn):
+    """Rebuild orders and order_items with AUTOINCREMENT (SQLite only).
+
+    Plain rowid keys reuse max(id) + 1, so after the newest orders were
+    archived a new order got an archived order's id. The id counters start
+    above the archive tables' ids too.
+    """
+    if conn.dialect.name != "sqlite":
+        return
+    for model, archive in ((models.Order, "orders_archive"), (models.OrderItem, "order_items_archive")):
+        table = model.__table__
+        sql = conn.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": table.name}
+        ).scalar()
+        if "AUTOINCREMENT" not in sql.upper():
+            columns = ", ".join(column.name for column in table.columns)
+            # Legacy rename: keep other tables' foreign keys pointing at the
+            # name, which the rebuilt table takes over.
+            conn.execute(text("PRAGMA legacy_alter_table = ON"))
+            conn.execute(text(f"ALTER TABLE {table.name} RENAME TO {table.name}_rowid"))
+            conn.execute(text("PRAGMA legacy_alter_table = OFF"))
+            # Renaming moved the index names along with the table; free them.
+            index_names = conn.execute(text(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :name AND sql IS NOT NULL"
+            ), {"name": f"{table.name}_rowid"}).scalars().all()
+            for index_name in index_names:
+                conn.execute(text(f"DROP INDEX {index_name}"))
+            conn.execute(CreateTable(table))
+            conn.execute(text(f"INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {table.name}_rowid"))
+            conn.execute(text(f"DROP TABLE {table.name}_rowid"))
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+        last_id = conn.execute(text(
+            f"SELECT MAX(COALESCE((SELECT MAX(id) FROM {table.name}), 0),"
+            f" COALESCE((SELECT MAX(id) FROM {archive}), 0))"
+        )).scalar()
+        conn.execute(text("DELETE FROM sqlite_sequence WHERE name = :name"), {"name": table.name})
+        conn.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)"),
+                     {"name": table.name, "seq": last_id})
+
+
+MIGRATIONS = [
+    ("0001_orders_tracking_code", add_tracking_code),
+    ("0002_orders_status_created_at_indexes", add_order_status_created_at_indexes),
+    ("0003_order_status_counts", rebuild_order_status_counts),
+    ("0004_order_list_indexes", add_order_list_indexes),
+    ("0005_unit_price_and_daily_rollups", add_unit_price_and_rollups),
+    ("0006_autoincrement_order_ids", autoincrement_order_ids),
+]
+
+
+def upgrade(engine=default_engine):
+    """Create missing tables, then apply pending migrations in order."""
+    models.Base.metadata.create_all(bind=engine)
+    applied_now = []
+    with engine.begin() as conn:
+        applied = {row[0] for row in conn.execute(models.SchemaMigration.__table__.select())}
+        for migration_id, migrate in MIGRATIONS:
+            if migration_id in applied:
+                continue
+            migrate(conn)
+            conn.execute(insert(models.SchemaMigration), {
+                "id": migration_id, "applied_at": datetime.utcnow(),
+            })
+            applied_now.append(migration_id)
+    return applied_now
+
+
+if __name__ == "__main__":
+    applied = upgrade()
+    if applied:
+        print(f"Applied migrations: {', '.join(applied)}")
+    else:
+        print("Database schema is up to date.")
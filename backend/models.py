@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Date, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .database import Base
@@ -36,18 +36,83 @@ class Order(Base):
     tracking_code = Column(String, unique=True, index=True)
     user_details = Column(String) # JSON or simple string for MVP
     total_amount = Column(Float, default=0.0)
-    order_status = Column(String, default="Pending") # Pending, Preparing, Ready, Completed, Cancelled
-    created_at = Column(DateTime, default=datetime.utcnow)
+    order_status = Column(String, default="Pending", index=True) # Pending, Preparing, Ready, Completed, Cancelled
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
 
     items = relationship("OrderItem", back_populates="order")
 
+    __table_args__ = (
+        # Keyset pagination: newest first, optionally within one status
+        Index("ix_orders_created_at_id", "created_at", "id"),
+        Index("ix_orders_status_created_at_id", "order_status", "created_at", "id"),
+        # Never reuse ids of orders moved to orders_archive (SQLite otherwise
+        # hands out max(id) + 1 again once the newest rows are archived).
+        {"sqlite_autoincrement": True},
+    )
+
 class OrderItem(Base):
     __tablename__ = "order_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"))
+    order_id = Column(Integer, ForeignKey("orders.id"), index=True)
     item_id = Column(Integer, ForeignKey("menu.id"))
     quantity = Column(Integer, default=1)
+    unit_price = Column(Float)  # menu price when the order was placed
 
     order = relationship("Order", back_populates="items")
     menu_item = relationship("Menu")
+
+    __table_args__ = {"sqlite_autoincrement": True}  # see Order
+
+class CacheVersion(Base):
+    __tablename__ = "cache_versions"
+
+    name = Column(String, primary_key=True)  # e.g. "menu"
+    version = Column(Integer, default=0, nullable=False)
+
+class OrderStatusCount(Base):
+    __tablename__ = "order_status_counts"
+
+    # Maintained by crud on every order insert, status change and delete so
+    # dashboard statistics don't have to count the orders table.
+    status = Column(String, primary_key=True)
+    count = Column(Integer, default=0, nullable=False)
+
+class SchemaMigration(Base):
+    __tablename__ = "schema_migrations"
+
+    id = Column(String, primary_key=True)
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
+class ItemDailySales(Base):
+    __tablename__ = "item_daily_sales"
+
+    # Analytics rollup maintained by backend/rollups.py as orders are
+    # created and deleted.
+    day = Column(Date, primary_key=True)
+    item_id = Column(Integer, primary_key=True)
+    item_name = Column(String)  # name at order time
+    quantity = Column(Integer, default=0, nullable=False)
+    income = Column(Float, default=0.0, nullable=False)
+
+class OrderArchive(Base):
+    __tablename__ = "orders_archive"
+
+    # Completed/Cancelled orders moved out of orders by backend/archive.py.
+    # Same ids and columns; read by tracking lookups and rollup rebuilds.
+    id = Column(Integer, primary_key=True)
+    tracking_code = Column(String, index=True)
+    user_details = Column(String)
+    total_amount = Column(Float, default=0.0)
+    order_status = Column(String)
+    created_at = Column(DateTime)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+class OrderItemArchive(Base):
+    __tablename__ = "order_items_archive"
+
+    id = Column(Integer, primary_key=True)
+    order_id = Column(Integer, index=True)
+    item_id = Column(Integer)
+    quantity = Column(Integer, default=1)
+    unit_price = Column(Float)
@@ -0,0 +1,162 @@
+import os
+import re
+from typing import List, NamedTuple
+from rapidfuzz import fuzz
+from .menu_index import normalize
+
+# Structured order parsing for chat messages.
+#
+# "2 pepperoni pizza and 3 coca cola" becomes [(Pepperoni Pizza, 2), (Coca Cola, 3)].
+# The message is cut into segments at punctuation, at joining words (and,
+# aur, plus, ...) and in front of every quantity, so each segment holds at
+# most one quantity and one item. Each segment is matched against the menu
+# index; segments made only of order phrasing ("I want", "please") are
+# dropped, any other segment without a menu item ("a coke") is asked about.
+# Quantities may be digits or number words in English, Roman Urdu or Urdu.
+#
+# A segment matches an item only if it names it: the full-name score must
+# clear MATCH_THRESHOLD and the segment must contain at least half of the
+# name's words, so "coke" does not match "Grilled Chicken Sandwich". When
+# several items fit equally well ("2 pizza"), when a quantity is over
+# CHAT_ORDER_MAX_QUANTITY, or when part of an order is not on the menu, the
+# customer is asked instead of guessing, and nothing is ordered.
+
+MATCH_THRESHOLD = 70  # fuzz.token_set_ratio of segment vs. item name
+WORD_MATCH_THRESHOLD = 80  # a name word counts as said when a segment word is this close
+MIN_NAME_COVERAGE = 0.5
+AMBIGUITY_MARGIN = 5  # a runner-up this close to the best match makes it ambiguous
+CANDIDATES = 10
+MAX_LISTED_CHOICES = 5
+MAX_QUANTITY = int(os.getenv("CHAT_ORDER_MAX_QUANTITY", "20"))
+
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "dozen": 12,
+    "ek": 1, "do": 2, "teen": 3, "char": 4, "chaar": 4, "panch": 5, "paanch": 5,
+    "chay": 6, "chhe": 6, "chhay": 6, "saat": 7, "aath": 8, "nau": 9, "das": 10,
+    "ایک": 1, "دو": 2, "تین": 3, "چار": 4, "پانچ": 5, "چھ": 6, "سات": 7,
+    "آٹھ": 8, "نو": 9, "دس": 10,
+}
+# Number words that are also common words ("do you have ..."): only a
+# quantity when the next word belongs to the item's name.
+AMBIGUOUS_NUMBER_WORDS = {"do", "char", "nau", "نو"}
+
+JOIN_WORDS = {"and", "aur", "plus", "also", "then", "اور"}
+
+# Order phrasing around the items: left out when matching a segment, and a
+# segment of nothing else names no item.
+FILLER_WORDS = {
+    "i", "ll", "want", "would", "like", "to", "have", "give", "get", "me", "us", "send",
+    "can", "could", "may", "please", "pls", "order", "buy", "a", "an", "the", "some",
+    "of", "more", "thanks", "thank", "you",
+    "mujhe", "hamein", "chahiye", "chahye", "de", "dein", "dedo", "bhej", "karo", "kar",
+    "mangwana", "hai", "bhi", "مجھے", "چاہیے", "دیں", "دے",
+}
+
+_separators = re.compile(r"[,،;+&\n]")
+_digits = re.compile(r"^(\d+)x?$")
+
+
+def quantity_of(token: str):
+    match = _digits.match(token)
+    if match:
+        return int(match.group(1))
+    return NUMBER_WORDS.get(token)
+
+
+def segments(message: str):
+    """[(quantity or None, quantity token, words)] in message order."""
+    parts = []
+    for piece in _separators.split(message):
+        quantity, qty_token, words = None, None, []
+        for token in normalize(piece).split():
+            if token in JOIN_WORDS:
+                parts.append((quantity, qty_token, words))
+                quantity, qty_token, words = None, None, []
+                continue
+            number = quantity_of(token)
+            if number is not None:
+                parts.append((quantity, qty_token, words))
+                quantity, qty_token, words = number, token, []
+                continue
+            words.append(token)
+        parts.append((quantity, qty_token, words))
+    return [p for p in parts if p[2]]
+
+
+class ParsedOrder(NamedTuple):
+    lines: List[tuple]  # [(menu item, quantity)] in message order
+    questions: List[str]  # to ask the customer before anything is ordered
+
+
+def said_words(words, name: str) -> int:
+    """How many of the item name's words appear (fuzzily) among words."""
+    return sum(1 for n in name.split() if any(fuzz.ratio(n, w) >= WORD_MATCH_THRESHOLD for w in words))
+
+
+def match_items(index, words):
+    """[(item, coverage, said, score)] for items the segment names, best first.
+
+    Ranked by the share of the name that was said, then by how many of the
+    segment's words the name accounts for ("pepperoni pizza" prefers
+    Pepperoni Pizza over an item called just Pizza), then by score.
+    """
+    matches = []
+    for item, score in index.search(" ".join(words), MATCH_THRESHOLD, limit=CANDIDATES, scorer=fuzz.token_set_ratio):
+        name = normalize(item.item)
+        said = said_words(words, name)
+        coverage = said / len(name.split())
+        if coverage >= MIN_NAME_COVERAGE:
+            matches.append((item, coverage, said, score))
+    matches.sort(key=lambda m: m[1:], reverse=True)
+    return matches
+
+
+def best_item(index, words):
+    """(item, []) for a clear match, (None, rivals) when several fit about
+    equally, (None, []) when nothing on the menu fits."""
+    matches = match_items(index, words)
+    if not matches:
+        return None, []
+    _, coverage, said, score = matches[0]
+    rivals = [item for item, c, n, s in matches if (c, n) == (coverage, said) and score - s < AMBIGUITY_MARGIN]
+    if len(rivals) > 1:
+        return None, rivals
+    return matches[0][0], []
+
+
+def choices(items) -> str:
+    names = [item.item for item in items[:MAX_LISTED_CHOICES]]
+    return ", ".join(names[:-1]) + " or " + names[-1]
+
+
+def parse_order(message: str, index) -> ParsedOrder:
+    """Order lines of the message (same item lines merged), plus any questions."""
+    lines, questions, unknown = {}, [], []
+    for quantity, qty_token, words in segments(message):
+        wanted = [w for w in words if w not in FILLER_WORDS]
+        if not wanted:
+            continue
+        text = " ".join(wanted)
+        item, rivals = best_item(index, wanted)
+        if rivals:
+            questions.append(f"Which one did you mean by “{text}”: {choices(rivals)}?")
+            continue
+        if item is None:
+            unknown.append(text)
+            continue
+        if qty_token in AMBIGUOUS_NUMBER_WORDS and words[0] not in normalize(item.item).split():
+            quantity = None
+        quantity = 1 if quantity is None else quantity
+        if quantity < 1:
+            continue
+        total = quantity + (lines[item.id][1] if item.id in lines else 0)
+        if total > MAX_QUANTITY:
+            questions.append(f"I can take at most {MAX_QUANTITY} × {item.item} in a chat order. How many would you like?")
+            continue
+        lines[item.id] = (item, total)
+    # Only worth asking about when the rest is an order; otherwise the
+    # message is probably not an order at all.
+    if unknown and (lines or questions):
+        questions.extend(f"I couldn't find “{text}” on the menu." for text in unknown)
+    return ParsedOrder(list(lines.values()), questions)
@@ -0,0 +1,132 @@
+import os
+import threading
+from .llm_providers import estimate_tokens
+from .menu_index import normalize
+
+# System prompt construction for AI-mode chat messages.
+#
+# The restaurant details, category list and rules only change with the menu,
+# so that prefix is rendered once per menu snapshot version. Per message we
+# add the menu items relevant to it (fuzzy name matches plus items of any
+# category it mentions, or the start of the menu when nothing matches) and
+# as much recent conversation as fits in PROMPT_TOKEN_BUDGET. Tokens are
+# estimated at ~4 characters each, the same estimate llm_providers uses.
+
+TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "1500"))
+MAX_MENU_ITEMS = int(os.getenv("PROMPT_MAX_MENU_ITEMS", "20"))
+MATCH_THRESHOLD = 70
+
+RULES = """RULES:
+- Reply in SAME language as user (English / Urdu / Roman Urdu)
+- Be friendly
+- Do NOT place order unless user clearly wants to buy
+- Use emojis 🍕🍔"""
+
+_prefix = None  # (menu version, text)
+_prefix_lock = threading.Lock()
+
+stats = {"prompts": 0, "prompt_tokens": 0, "max_prompt_tokens": 0, "history_truncated": 0, "menu_truncated": 0}
+
+
+def menu_categories(snapshot):
+    """Category names in menu order, from the items themselves."""
+    return list(dict.fromkeys(item.category for item in snapshot.items))
+
+
+def render_prefix(snapshot) -> str:
+    restaurant = snapshot.restaurant
+    categories = ", ".join(menu_categories(snapshot)) or "None yet"
+    return f"""You are a restaurant AI assistant.
+
+Restaurant Name: {restaurant.name if restaurant else "Fast Food"}
+Owner: {restaurant.owner if restaurant else "Ameer Gul"}
+Phone: {restaurant.phone if restaurant else "03151095812"}
+Address: {restaurant.address if restaurant else "Karachi"}
+
+Menu categories: {categories}
+Only the menu items relevant to this conversation are listed below; if the
+user asks about something not listed, suggest a category instead of guessing.
+
+{RULES}
+"""
+
+
+def get_prefix(snapshot) -> str:
+    global _prefix
+    cached = _prefix
+    if cached is not None and cached[0] == snapshot.version:
+        return cached[1]
+    with _prefix_lock:
+        if _prefix is None or _prefix[0] != snapshot.version:
+            _prefix = (snapshot.version, render_prefix(snapshot))
+        return _prefix[1]
+
+
+def menu_line(item) -> str:
+    return f"- {item.item} (${item.price}) [{item.category}]"
+
+
+def relevant_items(snapshot, message: str):
+    """Items matching the message by name or category, best name matches first."""
+    items = [item for item, score in snapshot.index.search(message, MATCH_THRESHOLD, limit=MAX_MENU_ITEMS)]
+    normalized = normalize(message)
+    mentioned = {c for c in menu_categories(snapshot) if normalize(c) and normalize(c) in normalized}
+    if mentioned:
+        seen = {item.id for item in items}
+        items += [item for item in snapshot.items if item.category in mentioned and item.id not in seen]
+    return items[:MAX_MENU_ITEMS]
+
+
+def fit_lines(lines, budget: int):
+    """Longest prefix of lines whose estimated tokens fit in budget."""
+    kept = []
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if cost > budget:
+            break
+        kept.append(line)
+        budget -= cost
+    return kept
+
+
+def build_system_prompt(snapshot, message: str, history, budget: int = TOKEN_BUDGET) -> str:
+    """System prompt for message within budget tokens (including the message).
+
+    Budget order: static prefix, relevant menu items, then history from the
+    newest entry back. With no relevant items the menu's first items fill at
+    most half of what is left, so history still gets room.
+    """
+    prefix = get_prefix(snapshot)
+    remaining = budget - estimate_tokens(prefix) - estimate_tokens(message)
+
+    items = relevant_items(snapshot, message)
+    menu_budget = remaining if items else remaining // 2
+    candidates = items or snapshot.items[:MAX_MENU_ITEMS]
+    menu_lines = fit_lines([menu_line(item) for item in candidates], menu_budget)
+    if len(menu_lines) < len(candidates) or (not items and len(snapshot.items) > len(candidates)):
+        stats["menu_truncated"] += 1
+    remaining -= sum(estimate_tokens(line) + 1 for line in menu_lines)
+
+    history_lines = fit_lines([f"{role}: {text}" for role, text in reversed(history)], remaining)
+    history_lines.reverse()
+    if len(history_lines) < len(history):
+        stats["history_truncated"] += 1
+
+    menu_text = "\n".join(menu_lines) or "(no matching items)"
+    history_text = "\n".join(history_lines)
+    prompt = f"{prefix}\nMENU:\n{menu_text}\n\nConversation:\n{history_text}\n"
+
+    tokens = estimate_tokens(prompt) + estimate_tokens(message)
+    stats["prompts"] += 1
+    stats["prompt_tokens"] += tokens
+    stats["max_prompt_tokens"] = max(stats["max_prompt_tokens"], tokens)
+    return prompt
+
+
+def get_stats():
+    prompts = stats["prompts"]
+    return {
+        **stats,
+        "avg_prompt_tokens": round(stats["prompt_tokens"] / prompts, 1) if prompts else 0.0,
+        "token_budget": TOKEN_BUDGET,
+    }
@@ -0,0 +1,73 @@
+import os
+from .menu_index import normalize
+from .ttl_cache import TTLCache
+
+# Opt-in cache of LLM replies for FAQ-style chat messages.
+#
+# Keys are (intent, normalized message, menu snapshot version), so any menu
+# or restaurant-info write changes the key and old answers stop matching.
+# Only conversation-free questions are cached: a message with a recognised
+# FAQ intent, or the first message of a session. Anything else depends on
+# history and bypasses the cache. Enable with LLM_RESPONSE_CACHE=1.
+
+ENABLED = os.getenv("LLM_RESPONSE_CACHE", "0").lower() in ("1", "true", "yes")
+MAX_ENTRIES = int(os.getenv("LLM_RESPONSE_CACHE_SIZE", "1000"))
+TTL_SECONDS = float(os.getenv("LLM_RESPONSE_CACHE_TTL", "600"))
+
+FAQ_KEYWORDS = {
+    "menu": ["menu", "what do you have", "what do you sell", "kya milta"],
+    "hours": ["timing", "timings", "hours", "open", "close", "kab khulta"],
+    "contact": ["phone", "number", "contact", "call", "whatsapp"],
+    "location": ["address", "location", "where are you", "kahan"],
+    "owner": ["owner", "malik"],
+}
+
+cache = TTLCache(MAX_ENTRIES, TTL_SECONDS, sizeof=lambda reply: len(reply.encode("utf-8")))
+stats = {"bypassed": 0, "stored": 0}
+
+
+def classify_faq(normalized_message: str):
+    for intent, keywords in FAQ_KEYWORDS.items():
+        if any(k in normalized_message for k in keywords):
+            return intent
+    return None
+
+
+def make_key(message: str, menu_version: int, history):
+    """Cache key for this message, or None if it must go to the LLM."""
+    if not ENABLED:
+        return None
+    normalized = normalize(message)
+    intent = classify_faq(normalized)
+    if intent is None:
+        if history:
+            stats["bypassed"] += 1
+            return None
+        intent = "general"
+    return (intent, normalized, menu_version)
+
+
+def get(key):
+    if key is None:
+        return None
+    return cache.get(key)
+
+
+def put(key, reply: str, ok: bool):
+    # ok is the LLM call's outcome: a failed call's text (an error message,
+    # maybe after part of a streamed reply) is not an answer.
+    if key is None or not ok:
+        return
+    cache.set(key, reply)
+    stats["stored"] += 1
+
+
+def get_stats():
+    cache_stats = cache.get_stats()
+    lookups = cache_stats["hits"] + cache_stats["misses"]
+    return {
+        "enabled": ENABLED,
+        **stats,
+        **cache_stats,
+        "hit_ratio": round(cache_stats["hits"] / lookups, 4) if lookups else 0.0,
+    }
@@ -0,0 +1,158 @@
+"""
+Per-item, per-day sales rollups (item_daily_sales) behind /analytics/.
+
+crud applies each order's line items when the order is created and removes
+them when it is deleted, in the same transaction, so /analytics/ reads
+O(items x days) rows instead of joining every order line. Income uses the
+unit price captured on the order item, not today's menu price.
+
+Archiving orders (backend/archive.py) leaves the rollup alone; a rebuild
+reads the archive tables as well as the live ones. Item names are the ones
+recorded when the orders were placed; a rebuild keeps them and only names
+new rows from the menu. Rebuild (e.g. after a bulk import) with:
+
+    python -m backend.rollups rebuild
+"""
+import sys
+from collections import defaultdict
+from sqlalchemy import Column, Date, Float, Integer, MetaData, String, Table, and_, cast, func, insert, select, union_all, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.schema import CreateTable, DropTable
+from . import models, versions
+
+ItemDailySales = models.ItemDailySales
+
+
+def aggregate(lines):
+    """Sum (day, item_id, item_name, quantity, unit_price) lines per day and item."""
+    totals = defaultdict(lambda: [None, 0, 0.0])
+    for day, item_id, item_name, quantity, unit_price in lines:
+        entry = totals[(day, item_id)]
+        entry[0] = item_name
+        entry[1] += quantity
+        entry[2] += quantity * (unit_price or 0.0)
+    return [
+        {"day": day, "item_id": item_id, "item_name": name, "quantity": quantity, "income": income}
+        for (day, item_id), (name, quantity, income) in totals.items()
+    ]
+
+
+def add_lines(db, lines):
+    """Add order lines to the rollup (upsert per day and item)."""
+    rows = aggregate(lines)
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    insert_fn = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    stmt = insert_fn(ItemDailySales)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ItemDailySales.day, ItemDailySales.item_id],
+        set_={
+            "item_name": stmt.excluded.item_name,
+            "quantity": ItemDailySales.quantity + stmt.excluded.quantity,
+            "income": ItemDailySales.income + stmt.excluded.income,
+        },
+    )
+    db.execute(stmt, rows)
+
+
+def remove_lines(db, lines):
+    """Subtract order lines from the rollup (order deleted)."""
+    for row in aggregate(lines):
+        db.execute(
+            update(ItemDailySales)
+            .where(ItemDailySales.day == row["day"], ItemDailySales.item_id == row["item_id"])
+            .values(
+                quantity=ItemDailySales.quantity - row["quantity"],
+                income=ItemDailySales.income - row["income"],
+            )
+        )
+
+
+def order_lines(db, order_ids):
+    """Rollup lines for already-stored orders."""
+    return db.execute(
+        select(
+            func.date(models.Order.created_at, type_=Date),
+            models.OrderItem.item_id,
+            models.Menu.item,
+            models.OrderItem.quantity,
+            func.coalesce(models.OrderItem.unit_price, models.Menu.price),
+        )
+        .join(models.Order, models.Order.id == models.OrderItem.order_id)
+        .outerjoin(models.Menu, models.Menu.id == models.OrderItem.item_id)
+        .where(models.OrderItem.order_id.in_(order_ids))
+    ).all()
+
+
+def stored_lines(order, order_item):
+    """(day, item_id, quantity, unit_price) for every line of an order table pair."""
+    return (
+        select(
+            func.date(order.created_at).label("day"),
+            order_item.item_id,
+            order_item.quantity,
+            order_item.unit_price,
+        )
+        .join(order, order.id == order_item.order_id)
+    )
+
+
+# Rebuilt rows are staged here so the old rows' item names can be read
+# while the new totals are computed.
+staged = Table(
+    "item_daily_sales_rebuild", MetaData(),
+    Column("day", Date), Column("item_id", Integer), Column("item_name", String),
+    Column("quantity", Integer), Column("income", Float),
+    prefixes=["TEMPORARY"],
+)
+
+
+def rebuild(conn):
+    """Recompute item_daily_sales from the live and archived order tables.
+
+    Accepts a Session or Connection; the caller commits. Bumps the orders
+    version so /analytics/ ETags change.
+    """
+    lines = union_all(
+        stored_lines(models.Order, models.OrderItem),
+        stored_lines(models.OrderArchive, models.OrderItemArchive),
+    ).subquery()
+    unit_price = func.coalesce(lines.c.unit_price, models.Menu.price, 0.0)
+    columns = ["day", "item_id", "item_name", "quantity", "income"]
+    conn.execute(CreateTable(staged))
+    conn.execute(
+        insert(staged).from_select(
+            columns,
+            select(
+                lines.c.day,
+                lines.c.item_id,
+                # As recorded at order time (add_lines), else today's menu name.
+                func.coalesce(
+                    func.max(ItemDailySales.item_name),
+                    func.max(models.Menu.item),
+                    "Item #" + cast(lines.c.item_id, String),
+                ),
+                func.sum(lines.c.quantity),
+                func.sum(lines.c.quantity * unit_price),
+            )
+            .outerjoin(models.Menu, models.Menu.id == lines.c.item_id)
+            .outerjoin(ItemDailySales, and_(
+                ItemDailySales.day == lines.c.day, ItemDailySales.item_id == lines.c.item_id,
+            ))
+            .group_by(lines.c.day, lines.c.item_id)
+        )
+    )
+    conn.execute(ItemDailySales.__table__.delete())
+    conn.execute(insert(ItemDailySales).from_select(columns, select(*[staged.c[name] for name in columns])))
+    conn.execute(DropTable(staged))
+    versions.bump_version(conn, versions.ORDERS)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["rebuild"]:
+        sys.exit("usage: python -m backend.rollups rebuild")
+    from .database import engine
+    with engine.begin() as connection:
+        rebuild(connection)
+    print("Rebuilt item_daily_sales.")
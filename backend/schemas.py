@@ -1,5 +1,5 @@
-from pydantic import BaseModel, ConfigDict
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Literal, Optional
 from datetime import datetime
 
 # Menu Schemas
@@ -57,14 +57,40 @@ class OrderItem(OrderItemBase):
     
     id: int
     order_id: int
+    unit_price: Optional[float] = None  # price charged when ordered
     menu_item: Optional[Menu] = None  # Include menu item details
 
 class OrderCreate(BaseModel):
     user_details: str
     items: List[OrderItemCreate]
 
+class OrderBulkCreate(BaseModel):
+    orders: List[OrderCreate] = Field(min_length=1, max_length=500)
+
+OrderStatus = Literal["Pending", "Preparing", "Ready", "Completed", "Cancelled"]
+
 class OrderUpdateStatus(BaseModel):
+    order_status: OrderStatus
+
+class OrderSummary(BaseModel):
+    """Order header columns only (GET /orders/?fields=summary)."""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    tracking_code: Optional[str] = None
+    user_details: str
+    total_amount: float
+    order_status: str
+    created_at: datetime
+
+class OrderTracking(BaseModel):
+    """What a customer sees for a tracking code (GET /orders/track/{code})."""
+    model_config = ConfigDict(from_attributes=True)
+
+    tracking_code: str
     order_status: str
+    total_amount: float
+    created_at: datetime
 
 class Order(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,68 @@
+import os
+from typing import NamedTuple, Optional
+from sqlalchemy.orm import Session
+from . import models
+from .ttl_cache import TTLCache
+
+# Order status by tracking code (GET /orders/track/{code}, chat "track" intent).
+#
+# Customers refresh tracking constantly, so lookups are answered from a small
+# TTL cache holding only what is shown: status, total and creation time.
+# Unknown codes are cached too (as None), which keeps words like "STATUS" in
+# chat messages from hitting the database on every try. crud invalidates
+# the code on every status change, delete and insert in this worker; writes
+# made by other workers show up once the entry expires (TRACKING_CACHE_TTL),
+# which is also the max-age clients are told to cache responses for.
+# Codes not found among live orders are looked up in orders_archive.
+
+MAX_ENTRIES = int(os.getenv("TRACKING_CACHE_SIZE", "10000"))
+TTL_SECONDS = float(os.getenv("TRACKING_CACHE_TTL", "5"))
+
+
+class TrackingStatus(NamedTuple):
+    tracking_code: str
+    order_status: str
+    total_amount: float
+    created_at: object
+
+    @property
+    def etag(self) -> str:
+        return f'W/"track-{self.tracking_code}-{self.order_status}-{self.total_amount}"'
+
+
+cache = TTLCache(MAX_ENTRIES, TTL_SECONDS)
+_NOT_FOUND = object()
+
+
+def get_status(db: Session, code: str) -> Optional[TrackingStatus]:
+    """Status for a tracking code (case-insensitive), or None if there is no such order."""
+    code = code.strip().upper()
+    cached = cache.get(code, _NOT_FOUND)
+    if cached is not _NOT_FOUND:
+        return cached
+    row = None
+    for table in (models.Order, models.OrderArchive):
+        row = db.query(
+            table.tracking_code, table.order_status, table.total_amount, table.created_at,
+        ).filter(table.tracking_code == code).first()
+        if row:
+            break
+    status = TrackingStatus(*row) if row else None
+    cache.set(code, status)
+    return status
+
+
+def invalidate(*codes):
+    for code in codes:
+        if code:
+            cache.pop(code)
+
+
+def get_stats():
+    cache_stats = cache.get_stats()
+    lookups = cache_stats["hits"] + cache_stats["misses"]
+    return {
+        **cache_stats,
+        "ttl_seconds": TTL_SECONDS,
+        "hit_ratio": round(cache_stats["hits"] / lookups, 4) if lookups else 0.0,
+    }
@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU cache with a per-entry TTL and an optional byte budget.
+
+    Entries expire ttl_seconds after they were last set. When the cache is
+    over max_entries or max_bytes, least recently used entries are evicted.
+    Evictions are counted by reason so callers can expose them as metrics.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, max_bytes=None, sizeof=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda value: 0)
+        self.bytes = 0
+        self._data = OrderedDict()  # key -> (expires_at, size, value)
+        self._lock = threading.Lock()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evicted_lru": 0,
+            "evicted_ttl": 0,
+            "evicted_memory": 0,
+        }
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.stats["misses"] += 1
+                return default
+            expires_at, size, value = entry
+            if expires_at <= time.monotonic():
+                self._remove(key, "evicted_ttl")
+                self.stats["misses"] += 1
+                return default
+            self._data.move_to_end(key)
+            self.stats["hits"] += 1
+            return value
+
+    def set(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (time.monotonic() + self.ttl_seconds, size, value)
+            self.bytes += size
+            self._evict()
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            self._remove(key)
+            return entry[2]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get_stats(self):
+        return {**self.stats, "entries": len(self._data), "bytes": self.bytes}
+
+    def _remove(self, key, reason=None):
+        _, size, _ = self._data.pop(key)
+        self.bytes -= size
+        if reason:
+            self.stats[reason] += 1
+
+    def _evict(self):
+        now = time.monotonic()
+        # Oldest entries sit at the front; drop the expired ones first.
+        while self._data:
+            key, (expires_at, _, _) = next(iter(self._data.items()))
+            if expires_at > now:
+                break
+            self._remove(key, "evicted_ttl")
+        while len(self._data) > self.max_entries:
+            self._remove(next(iter(self._data)), "evicted_lru")
+        while self.max_bytes is not None and self.bytes > self.max_bytes and len(self._data) > 1:
+            self._remove(next(iter(self._data)), "evicted_memory")
@@ -0,0 +1,26 @@
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+from . import models
+
+# Version counters for data that is cached in process. Writers bump the
+# counter inside their transaction; readers in any worker compare it with
+# the version their cached copy was built from. Both functions accept a
+# Session or a Connection (migrations and rollup rebuilds run on the latter).
+
+ORDERS = "orders"  # any order insert, status change or delete
+
+_versions = models.CacheVersion.__table__
+
+def get_version(db: Session, name: str) -> int:
+    version = db.execute(select(_versions.c.version).where(_versions.c.name == name)).scalar()
+    return version or 0
+
+def bump_version(db: Session, name: str) -> int:
+    """Increment a version counter and return the new value. Call before committing the write."""
+    updated = db.execute(
+        update(_versions).where(_versions.c.name == name).values(version=_versions.c.version + 1)
+    ).rowcount
+    if not updated:
+        db.execute(insert(_versions).values(name=name, version=1))
+        return 1
+    return get_version(db, name)
@@ -0,0 +1,100 @@
+"""
+Export throughput: rows/sec and memory growth of GET /orders/export and
+GET /analytics/export over the synthetic load-test database.
+
+    python -m benchmarks.bench_export --orders 1000000
+
+Shares the database (and its seeding) with benchmarks.loadtest. The app is
+called directly over ASGI and each chunk is counted and dropped (httpx's
+ASGITransport would buffer the whole body). Max RSS growth includes
+SQLite's page cache and mmap (SQLITE_CACHE_SIZE_KB, SQLITE_MMAP_SIZE), which
+are bounded; past those it should not grow with the number of rows. Rows are
+lines (CSV, minus the header) or objects (NDJSON).
+"""
+import argparse
+import asyncio
+import os
+import resource
+import time
+
+from benchmarks.loadtest import prepare_database, use_synthetic_database
+
+EXPORTS = [
+    ("orders csv", "/orders/export?format=csv"),
+    ("orders ndjson", "/orders/export?format=ndjson"),
+    ("analytics csv", "/analytics/export?format=csv"),
+    ("analytics ndjson", "/analytics/export?format=ndjson"),
+]
+
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def stream(app, url):
+    """GET url from app; returns (status, lines, bytes) without keeping the body."""
+    path, _, query = url.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "root_path": "", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+    received = {"status": None, "lines": 0, "bytes": 0}
+    requested = False
+    done = asyncio.Event()
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await done.wait()  # like a server: nothing more until the client goes away
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            received["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            body = message.get("body", b"")
+            received["lines"] += body.count(b"\n")
+            received["bytes"] += len(body)
+
+    await app(scope, receive, send)
+    done.set()
+    return received["status"], received["lines"], received["bytes"]
+
+
+async def run(args):
+    from backend import main
+
+    prepare_database(args)
+    async with main.app.router.lifespan_context(main.app):
+        for name, url in EXPORTS:
+            if args.only and args.only not in name:
+                continue
+            rss_before = max_rss_mb()
+            start = time.perf_counter()
+            status, lines, size = await stream(main.app, url)
+            elapsed = time.perf_counter() - start
+            if status != 200:
+                raise SystemExit(f"{url} answered {status}")
+            rows = lines - 1 if "csv" in name else lines
+            print(
+                f"{name:17} {rows:>9} rows  {elapsed:6.2f}s  {rows / elapsed:>9.0f} rows/s  "
+                f"{size / 1e6:7.1f} MB  max RSS +{max_rss_mb() - rss_before:.0f} MB"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--menu-items", type=int, default=10000)
+    parser.add_argument("--orders", type=int, default=1000000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db", help="database file (default: the load test's for this scale/seed)")
+    parser.add_argument("--fresh", action="store_true", help="delete and re-seed the database first")
+    parser.add_argument("--only", help="run only exports whose name contains this, e.g. csv")
+    args = parser.parse_args()
+
+    use_synthetic_database(args)
+    os.environ["LLM_PROVIDER"] = "stub"
+    asyncio.run(run(args))
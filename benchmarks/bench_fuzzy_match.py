@@ -0,0 +1,75 @@
+"""
+Micro-benchmark: legacy per-item fuzzy loop vs. the prebuilt MenuIndex.
+
+    python -m benchmarks.bench_fuzzy_match
+
+Menus of synthetic item names are built at each size; both matchers score the
+same chat messages. Index build time is reported separately since it is paid
+once per menu version, not per message.
+"""
+import itertools
+import random
+import time
+from types import SimpleNamespace
+
+from rapidfuzz import fuzz
+
+from backend.menu_index import MenuIndex
+
+SIZES = [10, 100, 1_000, 10_000]
+MESSAGES = [
+    "i want to order 2 pepperoni pizza and a coke please",
+    "give me one zinger burger",
+    "what desserts do you have?",
+    "mujhe ek chicken tikka sandwich chahiye",
+]
+ADJECTIVES = ["Spicy", "Classic", "Grilled", "Crispy", "Smoky", "Cheesy", "Double",
+              "Garlic", "Tandoori", "Peri Peri", "BBQ", "Honey", "Zinger", "Mighty"]
+BASES = ["Chicken", "Beef", "Veggie", "Paneer", "Fish", "Turkey", "Pepperoni", "Tikka",
+         "Mushroom", "Falafel", "Seekh", "Malai", "Margherita", "Chocolate"]
+KINDS = ["Pizza", "Burger", "Sandwich", "Wrap", "Salad", "Sub", "Roll", "Fries",
+         "Shake", "Cake", "Pasta", "Platter", "Cola", "Karahi"]
+
+
+def legacy_find_menu_items(message, menu_items, threshold=70):
+    results = []
+    msg = message.lower()
+    for item in menu_items:
+        score = fuzz.partial_ratio(item.item.lower(), msg)
+        if score >= threshold:
+            results.append(item)
+    return results
+
+
+def synthetic_menu(size):
+    names = [" ".join(p) for p in itertools.product(ADJECTIVES, BASES, KINDS)]
+    random.Random(42).shuffle(names)
+    while len(names) < size:
+        names += [f"{n} {len(names) // 1000}" for n in names[:size - len(names)]]
+    return [SimpleNamespace(id=i, item=name) for i, name in enumerate(names[:size])]
+
+
+def per_call_us(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for message in MESSAGES:
+            fn(message)
+    return (time.perf_counter() - start) / (repeat * len(MESSAGES)) * 1e6
+
+
+def main():
+    print(f"{'items':>7} {'legacy us':>12} {'index us':>12} {'speedup':>8} {'build ms':>9}")
+    for size in SIZES:
+        items = synthetic_menu(size)
+        start = time.perf_counter()
+        index = MenuIndex(items)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        repeat = max(1, 20_000 // size)
+        legacy = per_call_us(lambda m: legacy_find_menu_items(m, items), repeat)
+        indexed = per_call_us(lambda m: index.search(m), repeat)
+        print(f"{size:>7} {legacy:>12.1f} {indexed:>12.1f} {legacy / indexed:>7.1f}x {build_ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
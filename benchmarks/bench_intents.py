@@ -0,0 +1,62 @@
+"""
+Intent router: routing cost per message and share of a sample chat mix
+answered without the LLM.
+
+    python -m benchmarks.bench_intents --repeat 2000
+
+Uses the menu snapshot of a synthetic menu, so it needs no database.
+order and track answers need the database; they count as routed when
+detected (the app places or looks up the order for them).
+"""
+import argparse
+import time
+
+from backend import intents, menu_cache, schemas
+
+SAMPLE_MESSAGES = [
+    "what's on the menu?", "menu please", "kya milta hai", "show me your drinks", "pasta options",
+    "how much is the pepperoni pizza", "pizza kitne ka hai", "burger ki qeemat kya hai",
+    "what is your phone number", "aap ka address kya hai", "whatsapp number?",
+    "track my order AB12CD", "mera order kahan hai", "order status QW34ER",
+    "I want 2 margherita pizza", "give me a coke", "1 zinger burger chahiye",
+    "hello", "is the pizza spicy?", "recommend something for kids", "thanks!",
+]
+
+
+def make_snapshot():
+    names = [("Margherita Pizza", "Pizza"), ("Pepperoni Pizza", "Pizza"), ("Zinger Burger", "Burgers"),
+             ("Beef Burger", "Burgers"), ("Spaghetti Carbonara", "Pasta"), ("Coca Cola", "Beverage"),
+             ("Chocolate Cake", "Dessert")]
+    items = [schemas.Menu(id=i + 1, item=n, category=c, price=5.0 + i, description="") for i, (n, c) in enumerate(names)]
+    return menu_cache.MenuSnapshot(version=1, items=items, categories=[], restaurant=None)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+    snapshot = make_snapshot()
+
+    routed = 0
+    for message in SAMPLE_MESSAGES:
+        detected = intents.detect(message)
+        reply = None
+        for intent, confidence in detected:
+            reply = "db" if intent in ("order", "track") else intents.answer(intent, message, snapshot)
+            if reply is not None:
+                break
+        routed += reply is not None
+        print(f"{message:<36} {detected[0][0] + f' {detected[0][1]:.2f}' if detected else '-':<14} "
+              f"{'local' if reply is not None else 'LLM'}")
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for message in SAMPLE_MESSAGES:
+            intents.detect(message)
+    per_message = (time.perf_counter() - start) / (args.repeat * len(SAMPLE_MESSAGES))
+    print(f"\nanswered without the LLM: {routed}/{len(SAMPLE_MESSAGES)} "
+          f"({routed / len(SAMPLE_MESSAGES):.0%}); detect() {per_message * 1e6:.1f} µs/message")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Cost of the /metrics instrumentation on the request path.
+
+    python -m benchmarks.bench_metrics --n 200000
+
+Times Histogram.observe, the Timer context manager used for chat stages,
+and the per-request overhead of MetricsMiddleware around a trivial ASGI app
+(no FastAPI routing, so the difference is the middleware alone).
+"""
+import argparse
+import asyncio
+import time
+
+from backend import metrics
+
+
+def per_call_us(fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+async def trivial_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def call_app(app, n):
+    scope = {"type": "http", "method": "GET", "path": "/bench"}
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(n):
+        await app(scope, receive, send)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=200_000)
+    args = parser.parse_args()
+
+    histogram = metrics.Histogram("bench_seconds", "benchmark only", ["stage"])
+
+    def timed_block():
+        with histogram.time("bench"):
+            pass
+
+    print(f"Histogram.observe       {per_call_us(lambda: histogram.observe(0.003, 'bench'), args.n):6.2f} µs")
+    print(f"Timer context manager   {per_call_us(timed_block, args.n):6.2f} µs")
+    bare = asyncio.run(call_app(trivial_app, args.n))
+    wrapped = asyncio.run(call_app(metrics.MetricsMiddleware(trivial_app), args.n))
+    print(f"MetricsMiddleware       {wrapped - bare:6.2f} µs/request ({bare:.2f} -> {wrapped:.2f})")
+
+
+if __name__ == "__main__":
+    main()
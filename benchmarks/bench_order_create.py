@@ -0,0 +1,99 @@
+"""
+Order-creation throughput: legacy create_order vs. the single-transaction
+version and POST /orders/bulk style batches.
+
+    python -m benchmarks.bench_order_create --orders 500 --items 10
+
+Runs against a throwaway SQLite file and counts SQL statements and commits
+per order alongside orders/sec.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from backend import crud, models, schemas
+
+
+def legacy_create_order(db, order):
+    """crud.create_order as it was before batching (two commits, N lookups)."""
+    total_amount = 0.0
+    code = crud.generate_tracking_code()
+    while db.query(models.Order).filter(models.Order.tracking_code == code).first():
+        code = crud.generate_tracking_code()
+    db_order = models.Order(user_details=order.user_details, tracking_code=code, order_status="Pending")
+    db.add(db_order)
+    db.commit()
+    db.refresh(db_order)
+    for item in order.items:
+        menu_item = db.query(models.Menu).filter(models.Menu.id == item.item_id).first()
+        if menu_item:
+            total_amount += menu_item.price * item.quantity
+            db.add(models.OrderItem(order_id=db_order.id, item_id=item.item_id, quantity=item.quantity))
+    db_order.total_amount = total_amount
+    db.commit()
+    db.refresh(db_order)
+    return db_order
+
+
+def make_session(path):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    models.Base.metadata.create_all(bind=engine)
+    counters = {"statements": 0, "commits": 0}
+    event.listen(engine, "before_cursor_execute", lambda *a, **k: counters.__setitem__("statements", counters["statements"] + 1))
+    event.listen(engine, "commit", lambda *a: counters.__setitem__("commits", counters["commits"] + 1))
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    db.add_all(models.Menu(item=f"Item {i}", category="Bench", price=1.0 + i, description="") for i in range(50))
+    db.commit()
+    counters.update(statements=0, commits=0)
+    return engine, db, counters
+
+
+def run(label, n_orders, fn, tmpdir):
+    path = os.path.join(tmpdir, f"{label.replace(' ', '_')}.db")
+    engine, db, counters = make_session(path)
+    start = time.perf_counter()
+    fn(db)
+    elapsed = time.perf_counter() - start
+    db.close()
+    engine.dispose()
+    print(f"{label:<22} {n_orders / elapsed:>10.0f} orders/s "
+          f"{counters['statements'] / n_orders:>8.1f} stmts/order {counters['commits'] / n_orders:>6.2f} commits/order")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=500)
+    parser.add_argument("--items", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=50)
+    args = parser.parse_args()
+
+    order = schemas.OrderCreate(
+        user_details="Bench",
+        items=[schemas.OrderItemCreate(item_id=i % 50 + 1, quantity=2) for i in range(args.items)],
+    )
+
+    def legacy(db):
+        for _ in range(args.orders):
+            legacy_create_order(db, order)
+
+    def single(db):
+        for _ in range(args.orders):
+            crud.create_order(db, order)
+
+    def bulk(db):
+        for start in range(0, args.orders, args.batch):
+            crud.create_orders(db, [order] * min(args.batch, args.orders - start))
+
+    print(f"{args.orders} orders x {args.items} items")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        run("legacy create_order", args.orders, legacy, tmpdir)
+        run("create_order", args.orders, single, tmpdir)
+        run(f"bulk x{args.batch}", args.orders, bulk, tmpdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+GET /orders/ paging cost: offset vs. keyset cursor, full vs. summary rows.
+
+    python -m benchmarks.bench_pagination --orders 1000000
+
+Builds a throwaway SQLite database with --orders orders (two line items
+each) and times page 1 and page 10,000 (limit 100) for each strategy:
+
+- legacy: joinedload + OFFSET (crud.get_orders before cursors)
+- offset: selectinload + OFFSET
+- keyset: selectinload + cursor
+- summary: header columns + cursor
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from sqlalchemy.orm import joinedload, sessionmaker
+
+from backend import crud, migrations, models
+from backend.database import create_db_engine
+
+PAGE_SIZE = 100
+
+
+def seed(path, n_orders):
+    conn = sqlite3.connect(path)
+    conn.executescript(f"""
+        INSERT INTO menu (id, item, category, price, description)
+        WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 50)
+        SELECT i, 'Item ' || i, 'Bench', i * 1.5, '' FROM n;
+
+        INSERT INTO orders (id, tracking_code, user_details, total_amount, order_status, created_at)
+        WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < {n_orders})
+        SELECT i, printf('T%07d', i), 'Customer ' || i, 20.0,
+               CASE i % 5 WHEN 0 THEN 'Pending' WHEN 1 THEN 'Preparing' WHEN 2 THEN 'Ready'
+                          WHEN 3 THEN 'Completed' ELSE 'Cancelled' END,
+               datetime('2024-01-01', '+' || (i * 30) || ' seconds')
+        FROM n;
+
+        INSERT INTO order_items (order_id, item_id, quantity)
+        SELECT id, id % 50 + 1, 1 FROM orders UNION ALL SELECT id, (id + 7) % 50 + 1, 2 FROM orders;
+    """)
+    conn.commit()
+    conn.close()
+
+
+def legacy_get_orders(db, skip, limit):
+    return db.query(models.Order).options(
+        joinedload(models.Order.items).joinedload(models.OrderItem.menu_item)
+    ).order_by(models.Order.created_at.desc()).offset(skip).limit(limit).all()
+
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--page", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "pagination.db")
+        engine = create_db_engine(f"sqlite:///{path}")
+        migrations.upgrade(engine)
+        start = time.perf_counter()
+        seed(path, args.orders)
+        print(f"seeded {args.orders:,} orders in {time.perf_counter() - start:.1f}s")
+
+        db = sessionmaker(bind=engine)()
+        deep_skip = (args.page - 1) * PAGE_SIZE
+        # Cursor pointing just before the deep page (computed untimed, as a
+        # client would have received it from the previous page).
+        boundary = crud.get_order_summaries(db, skip=deep_skip - 1, limit=1)[0]
+        deep_cursor = crud.encode_order_cursor(boundary)
+
+        strategies = {
+            "legacy (joined+offset)": (
+                lambda: legacy_get_orders(db, 0, PAGE_SIZE),
+                lambda: legacy_get_orders(db, deep_skip, PAGE_SIZE)),
+            "offset (selectin)": (
+                lambda: crud.get_orders(db, limit=PAGE_SIZE),
+                lambda: crud.get_orders(db, skip=deep_skip, limit=PAGE_SIZE)),
+            "keyset (selectin)": (
+                lambda: crud.get_orders(db, limit=PAGE_SIZE),
+                lambda: crud.get_orders(db, limit=PAGE_SIZE, cursor=deep_cursor)),
+            "keyset summary": (
+                lambda: crud.get_order_summaries(db, limit=PAGE_SIZE),
+                lambda: crud.get_order_summaries(db, limit=PAGE_SIZE, cursor=deep_cursor)),
+        }
+        print(f"{'strategy':<24} {'page 1 ms':>10} {f'page {args.page:,} ms':>16}")
+        for name, (first, deep) in strategies.items():
+            db.expunge_all()
+            print(f"{name:<24} {timed(first):>10.2f} {timed(deep):>16.2f}")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
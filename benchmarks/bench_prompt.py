@@ -0,0 +1,91 @@
+"""
+System prompt size and build time vs. menu size: full-menu prompt vs. prompts.py.
+
+    python -m benchmarks.bench_prompt --sizes 10 100 1000 5000
+
+Uses synthetic menus (no database) and a ten-entry conversation. Tokens
+are the same ~4 characters/token estimate the app reports in /llm/stats.
+"""
+import argparse
+import time
+
+from backend import menu_cache, prompts, schemas
+from backend.llm_providers import estimate_tokens
+
+CATEGORIES = ["Pizza", "Burgers", "Pasta", "Salads", "Drinks", "Desserts", "Wraps", "Sides"]
+MESSAGES = [
+    "do you have a pepperoni pizza?",
+    "what drinks do you have",
+    "tell me something nice about your restaurant",
+]
+HISTORY = [("User" if i % 2 == 0 else "Assistant", f"turn {i}: " + "some earlier chat text " * 8) for i in range(10)]
+
+
+def make_snapshot(n_items):
+    items = [
+        schemas.Menu(
+            id=i + 1,
+            item=f"{['Pepperoni', 'Veggie', 'Chicken', 'Beef', 'Spicy'][i % 5]} {CATEGORIES[i % len(CATEGORIES)]} {i}",
+            category=CATEGORIES[i % len(CATEGORIES)],
+            price=round(3 + (i % 40) * 0.5, 2),
+            description="",
+        )
+        for i in range(n_items)
+    ]
+    restaurant = schemas.Restaurant(id=1, name="Bench", owner="Owner", phone="000", address="Here", description="")
+    return menu_cache.MenuSnapshot(version=n_items, items=items, categories=[], restaurant=restaurant)
+
+
+def legacy_prompt(snapshot, history):
+    """chatbot.build_system_prompt before prompts.py: the whole menu as a list repr."""
+    history_text = "\n".join([f"{r}: {t}" for r, t in history[-6:]])
+    restaurant = snapshot.restaurant
+    return f"""
+You are a restaurant AI assistant.
+
+Restaurant Name: {restaurant.name}
+Owner: {restaurant.owner}
+Phone: {restaurant.phone}
+Address: {restaurant.address}
+
+MENU:
+{[item.item + " ($" + str(item.price) + ")" for item in snapshot.items]}
+
+RULES:
+{prompts.RULES}
+
+Conversation:
+{history_text}
+"""
+
+
+def timed(fn, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    args = parser.parse_args()
+
+    print(f"{'items':>6} {'legacy tokens':>14} {'legacy ms':>10} {'new tokens (min/max)':>22} {'new ms':>8}")
+    for size in args.sizes:
+        snapshot = make_snapshot(size)
+        snapshot.index  # built once per menu version in the app
+        prompt, legacy_ms = timed(lambda: legacy_prompt(snapshot, HISTORY))
+        legacy_tokens = estimate_tokens(prompt)
+
+        new_tokens, new_ms = [], []
+        for message in MESSAGES:
+            prompt, ms = timed(lambda: prompts.build_system_prompt(snapshot, message, HISTORY))
+            new_tokens.append(estimate_tokens(prompt) + estimate_tokens(message))
+            new_ms.append(ms)
+        print(f"{size:>6} {legacy_tokens:>14} {legacy_ms:>10.2f} "
+              f"{f'{min(new_tokens)}/{max(new_tokens)}':>22} {max(new_ms):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+List endpoint serialization: the default response_model path against the
+FAST_JSON path, on the synthetic load-test database.
+
+    python -m benchmarks.bench_serialization --repeat 50
+
+First the contract check from test_serialization_contract.py (same status,
+parsed JSON body and X-Next-Cursor either way), otherwise the run stops.
+Then the mean time per request of each path and the speedup.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.loadtest import prepare_database, use_synthetic_database
+from test_serialization_contract import URLS, mismatches
+
+
+async def time_url(client, url, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        (await client.get(url)).raise_for_status()
+    return (time.perf_counter() - start) / repeat
+
+
+async def run(args):
+    import httpx
+    from backend import main, fast_json
+
+    prepare_database(args)
+    print(f"encoder: {'orjson' if fast_json.orjson is not None else 'json'}")
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        failed = await mismatches(client)
+        if failed:
+            raise SystemExit(f"contract check failed for {', '.join(failed)}")
+        print(f"contract: {len(URLS)} URLs return identical JSON")
+
+        for url in URLS:
+            fast_json.ENABLED = False
+            await time_url(client, url, 2)  # warm caches
+            slow = await time_url(client, url, args.repeat)
+            fast_json.ENABLED = True
+            fast = await time_url(client, url, args.repeat)
+            print(f"{url:70} default {slow * 1000:8.2f} ms  fast {fast * 1000:8.2f} ms  x{slow / fast:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--menu-items", type=int, default=10000)
+    parser.add_argument("--orders", type=int, default=1000000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db", help="database file (default: the load test's for this scale/seed)")
+    parser.add_argument("--fresh", action="store_true", help="delete and re-seed the database first")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    use_synthetic_database(args)
+    os.environ["LLM_PROVIDER"] = "stub"
+    asyncio.run(run(args))
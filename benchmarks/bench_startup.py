@@ -0,0 +1,68 @@
+"""
+Worker startup cost: importing backend.main and serving the first request.
+
+    python -m benchmarks.bench_startup --runs 5
+
+Each run starts a fresh interpreter (as a new uvicorn worker would) against
+a throwaway SQLite database prepared with `backend.migrations`, with
+GOOGLE_API_KEY blanked so no network is needed. It reports import time, time to the
+first GET /menu/ response through the app's lifespan, and the total.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+CHILD = r"""
+import asyncio, json, time
+start = time.perf_counter()
+import backend.main as main
+imported = time.perf_counter()
+
+import httpx
+
+async def first_request():
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.get("/menu/")
+            response.raise_for_status()
+            return time.perf_counter()
+
+served = asyncio.run(first_request())
+print(json.dumps({"import": imported - start, "first_request": served - imported, "total": served - start}))
+"""
+
+
+def run_once(env):
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD], env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env = dict(os.environ)
+        env["GOOGLE_API_KEY"] = ""  # also masks a key in backend/.env
+        env["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir, 'startup.db')}"
+        env["CONVERSATION_DB_PATH"] = os.path.join(tmpdir, "conversations.db")
+        subprocess.run([sys.executable, "-m", "backend.migrations"], env=env, check=True, capture_output=True)
+
+        runs = [run_once(env) for _ in range(args.runs)]
+
+    print(f"{'stage':<14} {'median ms':>10} {'max ms':>10}")
+    for stage in ("import", "first_request", "total"):
+        samples = [r[stage] * 1000 for r in runs]
+        print(f"{stage:<14} {statistics.median(samples):>10.1f} {max(samples):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Load test: /orders/ latency while many /chat/ requests wait on a slow LLM.
+
+The LLM is the deterministic stub provider (LLM_PROVIDER=stub) answering
+after --llm-latency seconds, so the run is offline and repeatable. Run from the project root:
+
+    python -m benchmarks.chat_load --chats 200 --llm-latency 2
+
+Runs against the synthetic load-test database (see benchmarks.loadtest),
+by default a small one, never the restaurant.db next to the code.
+
+With the async chat path the /orders/ percentiles measured while the chats are
+in flight should stay close to the idle baseline.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import time
+
+from benchmarks.loadtest import prepare_database, use_synthetic_database
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))]
+    return {
+        "p50_ms": round(pick(0.50) * 1000, 2),
+        "p95_ms": round(pick(0.95) * 1000, 2),
+        "max_ms": round(samples[-1] * 1000, 2),
+        "mean_ms": round(statistics.mean(samples) * 1000, 2),
+    }
+
+
+async def time_orders(client, n):
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        r = await client.get("/orders/")
+        r.raise_for_status()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def run(args):
+    import httpx
+    from backend import main
+
+    prepare_database(args)  # the app no longer migrates on import
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        baseline = await time_orders(client, args.samples)
+
+        async def one_chat(i):
+            r = await client.post("/chat/", json={"message": "hello there", "session_id": f"load-{i}"})
+            return r.status_code
+
+        chats = [asyncio.create_task(one_chat(i)) for i in range(args.chats)]
+        await asyncio.sleep(0.2)  # let the chats reach the LLM stage
+        under_load = await time_orders(client, args.samples)
+        codes = await asyncio.gather(*chats)
+
+    print(f"/orders/ idle:              {percentiles(baseline)}")
+    print(f"/orders/ with {args.chats} chats:    {percentiles(under_load)}")
+    print(f"chat status codes: { {c: codes.count(c) for c in sorted(set(codes))} }")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chats", type=int, default=200)
+    parser.add_argument("--llm-latency", type=float, default=2.0)
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--menu-items", type=int, default=100)
+    parser.add_argument("--orders", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db", help="database file (default: the load test's for this scale/seed)")
+    parser.add_argument("--fresh", action="store_true", help="delete and re-seed the database first")
+    args = parser.parse_args()
+
+    # Must be set before the backend is imported.
+    use_synthetic_database(args)
+    # Admit every chat so the run measures isolation, not load shedding.
+    os.environ.setdefault("CHAT_MAX_IN_FLIGHT", str(args.chats))
+    os.environ.setdefault("LLM_MAX_CONCURRENCY", str(args.chats))
+    os.environ["LLM_PROVIDER"] = "stub"
+    os.environ["STUB_LLM_LATENCY_SECONDS"] = str(args.llm_latency)
+    asyncio.run(run(args))
@@ -0,0 +1,240 @@
+"""
+Mixed-workload load test: chat, order creation, dashboard polling and
+analytics against a synthetic database, reported per endpoint as JSON.
+
+    python -m benchmarks.loadtest --menu-items 10000 --orders 1000000 --duration 60 --out run.json
+
+The database is seeded with seed_database.seed_synthetic into a file under
+the temp directory (named after the scale and seed, kept between runs so
+the 1M-order seed is paid once; --fresh re-seeds). The LLM is the stub
+provider answering after --llm-latency seconds, so runs are offline and
+repeatable. Diff two --out files to compare commits.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+# (name, weight); see WorkloadClient for what each one requests.
+WORKLOAD = [
+    ("chat_llm", 10),
+    ("chat_intent", 10),
+    ("chat_order", 5),
+    ("order_create", 10),
+    ("orders_list", 30),
+    ("orders_statistics", 15),
+    ("order_track", 10),
+    ("kitchen_queue", 10),
+    ("analytics", 10),
+    ("menu", 10),
+]
+
+LLM_MESSAGES = ["hello there", "is the pizza spicy?", "recommend something for kids", "thanks!"]
+INTENT_MESSAGES = ["what's on the menu?", "how much is the pepperoni pizza", "what is your phone number", "show me your drinks"]
+ORDER_MESSAGES = ["I want 2 margherita pizza", "give me a coca cola and 1 caesar salad", "1 chocolate cake chahiye"]
+
+
+def percentile(samples, q):
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def summarize(samples, errors, elapsed):
+    samples = sorted(samples)
+    if not samples:
+        return {"count": 0, "errors": errors}
+    return {
+        "count": len(samples),
+        "errors": errors,
+        "throughput_rps": round(len(samples) / elapsed, 1),
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 2),
+        "max_ms": round(samples[-1] * 1000, 2),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def use_synthetic_database(args):
+    """Point DATABASE_URL at the synthetic database for args; call before importing the backend."""
+    db_path = args.db or os.path.join(
+        tempfile.gettempdir(), f"loadtest-{args.menu_items}-{args.orders}-{args.seed}.db"
+    )
+    if args.fresh:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+
+def prepare_database(args):
+    """Migrate and, if the menu is empty, seed the database; returns its engine."""
+    from sqlalchemy import func, select
+
+    from backend import migrations, models
+    from backend.database import engine
+    import seed_database
+
+    migrations.upgrade()
+    with engine.connect() as conn:
+        seeded = conn.execute(select(func.count()).select_from(models.Menu)).scalar()
+    if not seeded:
+        start = time.perf_counter()
+        seed_database.seed_synthetic(engine, args.menu_items, args.orders, args.seed)
+        print(f"seeded {args.menu_items} items / {args.orders} orders in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return engine
+
+
+class WorkloadClient:
+    def __init__(self, client, menu_ids, track_codes, rng):
+        self.client = client
+        self.menu_ids = menu_ids
+        self.track_codes = track_codes
+        self.rng = rng
+        self.etags = {}  # dashboard pollers revalidate like a browser would
+
+    async def poll(self, url):
+        headers = {"If-None-Match": self.etags[url]} if url in self.etags else {}
+        r = await self.client.get(url, headers=headers)
+        if r.status_code == 200 and "etag" in r.headers:
+            self.etags[url] = r.headers["etag"]
+        return r
+
+    async def chat(self, messages):
+        session = f"load-{self.rng.randrange(1000)}"
+        return await self.client.post("/chat/", json={"message": self.rng.choice(messages), "session_id": session})
+
+    async def run(self, name):
+        if name == "chat_llm":
+            return await self.chat(LLM_MESSAGES)
+        if name == "chat_intent":
+            return await self.chat(INTENT_MESSAGES)
+        if name == "chat_order":
+            return await self.chat(ORDER_MESSAGES)
+        if name == "order_create":
+            items = [
+                {"item_id": self.rng.choice(self.menu_ids), "quantity": self.rng.randint(1, 3)}
+                for _ in range(self.rng.randint(1, 3))
+            ]
+            return await self.client.post("/orders/", json={"user_details": "Load Test", "items": items})
+        if name == "orders_list":
+            return await self.poll("/orders/?fields=summary&limit=50")
+        if name == "orders_statistics":
+            return await self.poll("/orders/statistics")
+        if name == "order_track":
+            return await self.poll(f"/orders/track/{self.rng.choice(self.track_codes)}")
+        if name == "kitchen_queue":
+            return await self.poll("/kitchen/queue")
+        if name == "analytics":
+            return await self.poll("/analytics/?days=30")
+        if name == "menu":
+            return await self.poll("/menu/")
+        raise ValueError(name)
+
+
+async def run(args):
+    import httpx
+    from sqlalchemy import select
+
+    from backend import main, models
+    import seed_database
+
+    engine = prepare_database(args)
+    with engine.connect() as conn:
+        menu_ids = list(conn.execute(select(models.Menu.id)).scalars())
+    # Customers refresh the tracking page of a handful of recent orders.
+    track_codes = [seed_database.tracking_code(args.orders - i) for i in range(min(args.orders, 100))]
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger("uvicorn.error").setLevel(logging.WARNING)
+    names = [name for name, _ in WORKLOAD]
+    weights = [weight for _, weight in WORKLOAD]
+    samples = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    statuses = {}
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            deadline = time.perf_counter() + args.duration
+
+            async def worker(i):
+                rng = random.Random(args.seed * 1000 + i)
+                workload = WorkloadClient(client, menu_ids, track_codes, rng)
+                while time.perf_counter() < deadline:
+                    name = rng.choices(names, weights)[0]
+                    start = time.perf_counter()
+                    try:
+                        r = await workload.run(name)
+                        status = r.status_code
+                    except httpx.HTTPError:
+                        status = "exception"
+                    elapsed = time.perf_counter() - start
+                    statuses[f"{name} {status}"] = statuses.get(f"{name} {status}", 0) + 1
+                    if status in (200, 304):
+                        samples[name].append(elapsed)
+                    else:
+                        errors[name] += 1
+
+            start = time.perf_counter()
+            await asyncio.gather(*(worker(i) for i in range(args.concurrency)))
+            elapsed = time.perf_counter() - start
+
+    all_samples = [s for name in names for s in samples[name]]
+    return {
+        "commit": git_commit(),
+        "config": {
+            "menu_items": args.menu_items, "orders": args.orders, "seed": args.seed,
+            "duration_s": args.duration, "concurrency": args.concurrency, "llm_latency_s": args.llm_latency,
+            "workload": dict(WORKLOAD),
+        },
+        "elapsed_s": round(elapsed, 2),
+        "endpoints": {name: summarize(samples[name], errors[name], elapsed) for name in names},
+        "total": summarize(all_samples, sum(errors.values()), elapsed),
+        "status_codes": dict(sorted(statuses.items())),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--menu-items", type=int, default=10000)
+    parser.add_argument("--orders", type=int, default=1000000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load")
+    parser.add_argument("--concurrency", type=int, default=50, help="concurrent clients")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="stub LLM seconds per reply")
+    parser.add_argument("--db", help="database file (default: one per scale/seed in the temp directory)")
+    parser.add_argument("--fresh", action="store_true", help="delete and re-seed the database first")
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    # Must be set before the backend is imported.
+    use_synthetic_database(args)
+    os.environ["LLM_PROVIDER"] = "stub"
+    os.environ["LLM_CHEAP_PROVIDER"] = ""
+    os.environ["STUB_LLM_LATENCY_SECONDS"] = str(args.llm_latency)
+    os.environ.setdefault("CHAT_MAX_IN_FLIGHT", str(args.concurrency))
+    os.environ.setdefault("LLM_MAX_CONCURRENCY", str(args.concurrency))
+    # Sessions repeat messages within seconds; time every chat instead of
+    # replaying them as retries (a zero window keeps no dedup entries).
+    os.environ["CHAT_DEDUP_WINDOW_SECONDS"] = "0"
+
+    report = json.dumps(asyncio.run(run(args)), indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
@@ -1,35 +1,18 @@
-import sqlite3
-import os
+"""
+Bring an existing restaurant.db up to the current schema.
 
-DB_PATH = "restaurant.db"
+Kept for existing setup instructions; the work is done by the migrations in
+backend/migrations.py (same as `python -m backend.migrations`).
+"""
+from backend import migrations
 
 def fix_db():
-    if not os.path.exists(DB_PATH):
-        print(f"Database not found at {DB_PATH}")
-        return
-
-    try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        # Check current columns
-        cursor.execute("PRAGMA table_info(orders)")
-        columns = [info[1] for info in cursor.fetchall()]
-        print(f"Current columns in 'orders': {columns}")
-        
-        if "tracking_code" not in columns:
-            print("Adding missing column 'tracking_code'...")
-            cursor.execute("ALTER TABLE orders ADD COLUMN tracking_code VARCHAR")
-            conn.commit()
-            print("Column added successfully.")
-        else:
-            print("Column 'tracking_code' already exists.")
-            
-        conn.close()
-        print("Database fix complete.")
-        
-    except Exception as e:
-        print(f"Error fixing database: {e}")
+    applied = migrations.upgrade()
+    if applied:
+        print(f"Applied migrations: {', '.join(applied)}")
+    else:
+        print("Database schema is up to date.")
+    print("Database fix complete.")
 
 if __name__ == "__main__":
     fix_db()
@@ -1,6 +1,7 @@
 import React, { useState } from 'react';
 import { BrowserRouter as Router, Routes, Route, Link, useLocation } from 'react-router-dom';
 import OrderList from './components/OrderList';
+import KitchenQueue from './components/KitchenQueue';
 import AnalyticsPage from './components/AnalyticsPage';
 import MenuPage from './components/MenuPage';
 import ChatInterface from './components/ChatInterface';
@@ -64,6 +65,9 @@ function Dashboard() {
         </div>
       </div>
 
+      {/* Kitchen Queue (active orders) */}
+      <KitchenQueue />
+
       {/* Orders List */}
       <OrderList />
     </div>
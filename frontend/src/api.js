@@ -12,17 +12,116 @@ const api = axios.create({
 export const getMenu = () => api.get('/menu/');
 export const getAnalytics = () => api.get('/analytics/');
 export const getOrders = () => api.get('/orders/'); // Added getOrders
+export const getKitchenQueue = () => api.get('/kitchen/queue');
+
+// Mirrors backend/kitchen_queue.py TRANSITIONS; the server answers 409 to anything else.
+export const NEXT_STATUSES = {
+    Pending: ['Preparing', 'Cancelled'],
+    Preparing: ['Ready', 'Cancelled'],
+    Ready: ['Completed', 'Cancelled'],
+    Completed: [],
+    Cancelled: [],
+};
 export const updateOrderStatus = (orderId, status) =>
     api.put(`/orders/${orderId}/status`, { order_status: status });
 export const deleteOrder = (orderId) => api.delete(`/orders/${orderId}`);
 export const createOrder = (order) => api.post('/orders/', order);
-export const sendChatMessage = (message) => api.post('/chat/', { message });
+export const sendChatMessage = (message, sessionId) =>
+    api.post('/chat/', { message, session_id: sessionId });
+
+// Streams the chatbot reply over SSE, calling onChunk(text) as pieces arrive.
+// Resolves with the full reply once the server sends the `done` event.
+export const streamChatMessage = async (message, sessionId, onChunk) => {
+    const response = await fetch(`${API_URL}/chat/stream`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ message, session_id: sessionId }),
+    });
+    if (!response.ok) {
+        throw new Error(`Chat stream failed with status ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const frame = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            const event = frame.match(/^event: (.*)$/m)?.[1];
+            const data = JSON.parse(frame.match(/^data: (.*)$/m)?.[1] ?? '{}');
+            if (event === 'chunk') onChunk(data.text);
+            if (event === 'done') return data.response;
+            if (event === 'error') throw new Error(data.detail);
+        }
+    }
+    throw new Error('Chat stream ended unexpectedly');
+};
 export const getOrderStatistics = () => api.get('/orders/statistics');
 export const createMenuItem = (item) => api.post('/menu/', item);
 export const deleteMenuItem = (itemId) => api.delete(`/menu/${itemId}`);
 export const getCategories = () => api.get('/categories');
 export const createCategory = (category) => api.post('/categories', category);
 
+// Server-pushed dashboard events (GET /events). orders_changed / menu_changed
+// cover writes handled by other backend workers.
+export const ORDER_EVENTS = ['order_created', 'order_status_changed', 'order_deleted', 'orders_changed'];
+export const MENU_EVENTS = ['menu_changed'];
+
+// Events that arrive within this long of each other reach a subscriber as
+// one call, so a burst of orders costs each component one refetch.
+export const EVENT_BATCH_MS = 1000;
+
+// One EventSource per tab, shared by every subscriber: opened with the first
+// subscription, closed with the last. It reconnects on its own if the link drops.
+const eventSubscribers = new Set();
+let eventSource = null;
+
+const openEventSource = () => {
+    eventSource = new EventSource(`${API_URL}/events`);
+    [...ORDER_EVENTS, ...MENU_EVENTS].forEach((name) => {
+        eventSource.addEventListener(name, (e) => {
+            const data = JSON.parse(e.data);
+            eventSubscribers.forEach((subscriber) => subscriber(name, data));
+        });
+    });
+};
+
+// Calls onEvents(batch) with the [name, data] pairs of the named events, at
+// most once per EVENT_BATCH_MS; returns an unsubscribe function.
+export const subscribeToEvents = (eventNames, onEvents) => {
+    let batch = [];
+    let timer = null;
+    const subscriber = (name, data) => {
+        if (!eventNames.includes(name)) return;
+        batch.push([name, data]);
+        if (timer === null) {
+            timer = setTimeout(() => {
+                const events = batch;
+                batch = [];
+                timer = null;
+                onEvents(events);
+            }, EVENT_BATCH_MS);
+        }
+    };
+
+    if (eventSource === null) openEventSource();
+    eventSubscribers.add(subscriber);
+    return () => {
+        clearTimeout(timer);
+        eventSubscribers.delete(subscriber);
+        if (eventSubscribers.size === 0) {
+            eventSource.close();
+            eventSource = null;
+        }
+    };
+};
+
 // Default export (Axios instance)
 export default api;
 
@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer } from 'recharts';
-import { getAnalytics } from '../api';
+import { getAnalytics, subscribeToEvents, ORDER_EVENTS, MENU_EVENTS } from '../api';
 
 const AnalyticsChart = () => {
     const [analyticsData, setAnalyticsData] = useState([]);
@@ -19,9 +19,13 @@ const AnalyticsChart = () => {
 
     useEffect(() => {
         fetchAnalytics();
-        // Auto-refresh every 5 seconds for live updates
-        const interval = setInterval(fetchAnalytics, 5000);
-        return () => clearInterval(interval);
+        // Live updates come from server events; poll slowly as a fallback
+        const unsubscribe = subscribeToEvents([...ORDER_EVENTS, ...MENU_EVENTS], () => fetchAnalytics());
+        const interval = setInterval(fetchAnalytics, 60000);
+        return () => {
+            unsubscribe();
+            clearInterval(interval);
+        };
     }, []);
 
     if (loading) {
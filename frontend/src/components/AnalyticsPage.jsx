@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer, PieChart, Pie, Cell } from 'recharts';
-import { getAnalytics, getOrderStatistics } from '../api';
+import { getAnalytics, getOrderStatistics, subscribeToEvents, ORDER_EVENTS, MENU_EVENTS } from '../api';
 
 const COLORS = ['#f59e0b', '#3b82f6', '#10b981', '#22c55e', '#ef4444'];
 
@@ -26,8 +26,12 @@ const AnalyticsPage = () => {
 
     useEffect(() => {
         fetchData();
-        const interval = setInterval(fetchData, 5000);
-        return () => clearInterval(interval);
+        const unsubscribe = subscribeToEvents([...ORDER_EVENTS, ...MENU_EVENTS], () => fetchData());
+        const interval = setInterval(fetchData, 60000);
+        return () => {
+            unsubscribe();
+            clearInterval(interval);
+        };
     }, []);
 
     if (loading) {
@@ -1,5 +1,5 @@
 import React, { useState, useRef, useEffect } from 'react';
-import { sendChatMessage } from '../api';
+import { streamChatMessage } from '../api';
 
 const ChatInterface = () => {
     const [messages, setMessages] = useState([
@@ -32,10 +32,23 @@ const ChatInterface = () => {
         setInput('');
         setLoading(true);
 
+        // Append the bot reply as it streams in; the typing indicator goes away
+        // as soon as the first chunk lands.
+        let started = false;
+        const appendChunk = (text) => {
+            setLoading(false);
+            setMessages(prev => {
+                if (!started) {
+                    started = true;
+                    return [...prev, { sender: 'bot', text }];
+                }
+                const last = prev[prev.length - 1];
+                return [...prev.slice(0, -1), { ...last, text: last.text + text }];
+            });
+        };
+
         try {
-            const response = await sendChatMessage(input, sessionId);
-            const botMessage = { sender: 'bot', text: response.data.response };
-            setMessages(prev => [...prev, botMessage]);
+            await streamChatMessage(input, sessionId, appendChunk);
         } catch (error) {
             console.error("Error sending message:", error);
             setMessages(prev => [...prev, { sender: 'bot', text: "Sorry, I'm having trouble connecting to the server." }]);
@@ -0,0 +1,111 @@
+import React, { useEffect, useState } from 'react';
+import { getKitchenQueue, updateOrderStatus, subscribeToEvents, ORDER_EVENTS, NEXT_STATUSES } from '../api';
+
+// Active orders as the server keeps them (GET /kitchen/queue): one column per
+// status, oldest first, so nothing is sorted or filtered here.
+const COLUMNS = [
+    { status: 'Pending', title: 'Pending', color: 'border-amber-400' },
+    { status: 'Preparing', title: 'Preparing', color: 'border-cyan-400' },
+    { status: 'Ready', title: 'Ready', color: 'border-emerald-400' },
+];
+
+// Timestamps are naive UTC.
+const minutesSince = (timestamp) =>
+    timestamp ? Math.max(0, Math.round((Date.now() - new Date(`${timestamp}Z`)) / 60000)) : null;
+
+const formatSeconds = (seconds) => (seconds == null ? '-' : `${Math.round(seconds / 60)} min`);
+
+const KitchenQueue = () => {
+    const [queues, setQueues] = useState({});
+    const [stats, setStats] = useState(null);
+
+    const fetchQueue = async () => {
+        try {
+            const response = await getKitchenQueue();
+            setQueues(response.data.queues);
+            setStats(response.data.stats);
+        } catch (error) {
+            console.error("Error fetching kitchen queue:", error);
+        }
+    };
+
+    useEffect(() => {
+        fetchQueue();
+        const unsubscribe = subscribeToEvents(ORDER_EVENTS, () => fetchQueue());
+        // Fallback poll; an unchanged queue comes back as a cheap 304.
+        const interval = setInterval(fetchQueue, 15000);
+        return () => {
+            unsubscribe();
+            clearInterval(interval);
+        };
+    }, []);
+
+    const handleAdvance = async (orderId, status) => {
+        try {
+            await updateOrderStatus(orderId, status);
+            fetchQueue();
+        } catch (error) {
+            console.error("Error updating status:", error);
+            alert(error.response?.data?.detail || "Failed to update status");
+        }
+    };
+
+    return (
+        <div className="bg-white shadow rounded-lg p-6">
+            <div className="flex flex-wrap items-center justify-between gap-4 mb-4">
+                <h2 className="text-xl font-semibold flex items-center gap-2">
+                    <span>👨‍🍳</span> Kitchen Queue {stats && `(${stats.active})`}
+                </h2>
+                {stats && (
+                    <div className="flex gap-4 text-sm text-gray-500">
+                        <span>Avg. wait: <b>{formatSeconds(stats.avg_wait_seconds)}</b></span>
+                        <span>Avg. prep: <b>{formatSeconds(stats.avg_prep_seconds)}</b></span>
+                        <span>Avg. handoff: <b>{formatSeconds(stats.avg_handoff_seconds)}</b></span>
+                    </div>
+                )}
+            </div>
+            <div className="grid grid-cols-1 md:grid-cols-3 gap-4">
+                {COLUMNS.map(({ status, title, color }) => {
+                    const orders = queues[status] || [];
+                    return (
+                        <div key={status} className={`bg-gray-50 rounded-lg p-3 border-t-4 ${color}`}>
+                            <h3 className="font-semibold text-gray-700 mb-3">{title} ({orders.length})</h3>
+                            <div className="space-y-3">
+                                {orders.length === 0 && <p className="text-sm text-gray-400">No orders</p>}
+                                {orders.map((order) => (
+                                    <div key={order.id} className="bg-white rounded-lg shadow-sm p-3">
+                                        <div className="flex justify-between text-sm">
+                                            <span className="font-mono font-bold text-emerald-600">{order.tracking_code || `#${order.id}`}</span>
+                                            <span className="text-gray-400">{minutesSince(order.created_at)} min</span>
+                                        </div>
+                                        <p className="text-sm font-medium text-gray-900 mt-1">{order.user_details}</p>
+                                        <ul className="text-sm text-gray-600 mt-1">
+                                            {order.items.map((line, i) => (
+                                                <li key={i}>{line.quantity}x {line.item}</li>
+                                            ))}
+                                        </ul>
+                                        <div className="flex gap-2 mt-2">
+                                            {NEXT_STATUSES[status].map((next) => (
+                                                <button
+                                                    key={next}
+                                                    onClick={() => handleAdvance(order.id, next)}
+                                                    className={`px-3 py-1 rounded text-xs font-medium ${next === 'Cancelled'
+                                                        ? 'bg-red-50 text-red-700 hover:bg-red-100'
+                                                        : 'bg-emerald-600 text-white hover:bg-emerald-700'}`}
+                                                >
+                                                    {next === 'Cancelled' ? 'Cancel' : `→ ${next}`}
+                                                </button>
+                                            ))}
+                                        </div>
+                                    </div>
+                                ))}
+                            </div>
+                        </div>
+                    );
+                })}
+            </div>
+        </div>
+    );
+};
+
+export default KitchenQueue;
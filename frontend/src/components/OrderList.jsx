@@ -1,5 +1,18 @@
 import React, { useEffect, useState } from 'react';
-import { getOrders, updateOrderStatus, deleteOrder, getMenu } from '../api';
+import { getOrders, updateOrderStatus, deleteOrder, getMenu, subscribeToEvents, ORDER_EVENTS, MENU_EVENTS, NEXT_STATUSES } from '../api';
+
+// Order history and search; active orders are worked from KitchenQueue.
+const STATUSES = ['Pending', 'Preparing', 'Ready', 'Completed', 'Cancelled'];
+
+// Status changes and deletes carry all the table needs, so they are applied
+// in place; only new orders (or writes seen by another worker) need a reload.
+const applyOrderEvents = (orders, events) => events.reduce((current, [name, data]) => {
+    if (name === 'order_status_changed') {
+        return current.map((order) => (order.id === data.id ? { ...order, order_status: data.status } : order));
+    }
+    if (name === 'order_deleted') return current.filter((order) => order.id !== data.id);
+    return current;
+}, orders);
 
 const OrderList = () => {
     const [orders, setOrders] = useState([]);
@@ -28,8 +41,19 @@ const OrderList = () => {
     useEffect(() => {
         fetchOrders();
         fetchMenu();
-        const interval = setInterval(fetchOrders, 5000);
-        return () => clearInterval(interval);
+        // Follow server-pushed changes; the slow poll is only a fallback
+        // (unchanged data comes back as a cheap 304).
+        const unsubscribe = subscribeToEvents([...ORDER_EVENTS, ...MENU_EVENTS], (events) => {
+            const names = events.map(([name]) => name);
+            if (names.some((name) => MENU_EVENTS.includes(name))) fetchMenu();
+            if (names.includes('order_created') || names.includes('orders_changed')) fetchOrders();
+            else setOrders((current) => applyOrderEvents(current, events));
+        });
+        const interval = setInterval(fetchOrders, 60000);
+        return () => {
+            unsubscribe();
+            clearInterval(interval);
+        };
     }, []);
 
     const handleStatusChange = async (orderId, newStatus) => {
@@ -38,6 +62,7 @@ const OrderList = () => {
             fetchOrders();
         } catch (error) {
             console.error("Error updating status:", error);
+            alert(error.response?.data?.detail || "Failed to update status");
         }
     };
 
@@ -223,11 +248,15 @@ const OrderList = () => {
                                                     onChange={(e) => handleStatusChange(order.id, e.target.value)}
                                                     className="mt-1 block w-full py-2 px-3 border border-gray-300 bg-white rounded-md shadow-sm focus:outline-none focus:ring-emerald-500 focus:border-emerald-500 sm:text-sm mb-2"
                                                 >
-                                                    <option value="Pending">Pending</option>
-                                                    <option value="Preparing">Preparing</option>
-                                                    <option value="Ready">Ready</option>
-                                                    <option value="Completed">Completed</option>
-                                                    <option value="Cancelled">Cancelled</option>
+                                                    {STATUSES.map(status => (
+                                                        <option
+                                                            key={status}
+                                                            value={status}
+                                                            disabled={status !== order.order_status && NEXT_STATUSES[order.order_status] && !NEXT_STATUSES[order.order_status].includes(status)}
+                                                        >
+                                                            {status}
+                                                        </option>
+                                                    ))}
                                                 </select>
                                                 <button
                                                     onClick={() => handleDeleteOrder(order.id)}
@@ -2,6 +2,9 @@
 REM Activate Python virtual environment
 call .venv\Scripts\activate
 
+REM Create tables and apply pending migrations (once, before the workers start)
+python -m backend.migrations
+
 REM Start FastAPI backend
 start cmd /k "uvicorn backend.main:app --reload --host 0.0.0.0 --port 8000"
 
@@ -1,11 +1,72 @@
 """
 Script to seed the database with sample menu items
+
+    python seed_database.py
+
+For benchmarks, --menu-items/--orders instead fill an empty database with
+synthetic data derived from the sample items (see seed_synthetic):
+
+    python seed_database.py --menu-items 10000 --orders 1000000
 """
-from backend.database import SessionLocal, engine
-from backend import models
+import argparse
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from backend.database import SessionLocal
+from backend import menu_cache, models, migrations, rollups, versions
 
-# Create tables
-models.Base.metadata.create_all(bind=engine)
+SAMPLE_MENU_ITEMS = [
+    {
+        "item": "Margherita Pizza",
+        "category": "Pizza",
+        "price": 12.99,
+        "description": "Classic pizza with tomato sauce, mozzarella, and basil"
+    },
+    {
+        "item": "Pepperoni Pizza",
+        "category": "Pizza",
+        "price": 14.99,
+        "description": "Pizza topped with pepperoni and mozzarella cheese"
+    },
+    {
+        "item": "Caesar Salad",
+        "category": "Salad",
+        "price": 8.99,
+        "description": "Fresh romaine lettuce with Caesar dressing and croutons"
+    },
+    {
+        "item": "Spaghetti Carbonara",
+        "category": "Pasta",
+        "price": 13.99,
+        "description": "Pasta with creamy sauce, bacon, and parmesan"
+    },
+    {
+        "item": "Grilled Chicken Sandwich",
+        "category": "Sandwich",
+        "price": 10.99,
+        "description": "Grilled chicken breast with lettuce, tomato, and mayo"
+    },
+    {
+        "item": "French Fries",
+        "category": "Sides",
+        "price": 4.99,
+        "description": "Crispy golden french fries"
+    },
+    {
+        "item": "Chocolate Cake",
+        "category": "Dessert",
+        "price": 6.99,
+        "description": "Rich chocolate cake with chocolate frosting"
+    },
+    {
+        "item": "Coca Cola",
+        "category": "Beverage",
+        "price": 2.99,
+        "description": "Refreshing soft drink"
+    }
+]
 
 def seed_menu():
     db = SessionLocal()
@@ -17,65 +78,109 @@ def seed_menu():
         db.close()
         return
     
-    # Sample menu items
-    menu_items = [
-        {
-            "item": "Margherita Pizza",
-            "category": "Pizza",
-            "price": 12.99,
-            "description": "Classic pizza with tomato sauce, mozzarella, and basil"
-        },
-        {
-            "item": "Pepperoni Pizza",
-            "category": "Pizza",
-            "price": 14.99,
-            "description": "Pizza topped with pepperoni and mozzarella cheese"
-        },
-        {
-            "item": "Caesar Salad",
-            "category": "Salad",
-            "price": 8.99,
-            "description": "Fresh romaine lettuce with Caesar dressing and croutons"
-        },
-        {
-            "item": "Spaghetti Carbonara",
-            "category": "Pasta",
-            "price": 13.99,
-            "description": "Pasta with creamy sauce, bacon, and parmesan"
-        },
-        {
-            "item": "Grilled Chicken Sandwich",
-            "category": "Sandwich",
-            "price": 10.99,
-            "description": "Grilled chicken breast with lettuce, tomato, and mayo"
-        },
-        {
-            "item": "French Fries",
-            "category": "Sides",
-            "price": 4.99,
-            "description": "Crispy golden french fries"
-        },
-        {
-            "item": "Chocolate Cake",
-            "category": "Dessert",
-            "price": 6.99,
-            "description": "Rich chocolate cake with chocolate frosting"
-        },
-        {
-            "item": "Coca Cola",
-            "category": "Beverage",
-            "price": 2.99,
-            "description": "Refreshing soft drink"
-        }
-    ]
     
-    for item_data in menu_items:
+    for item_data in SAMPLE_MENU_ITEMS:
         menu_item = models.Menu(**item_data)
         db.add(menu_item)
+    # Running workers reload their menu snapshot when this version changes.
+    versions.bump_version(db, menu_cache.MENU_VERSION)
     
     db.commit()
-    print(f"Successfully added {len(menu_items)} menu items to the database!")
+    print(f"Successfully added {len(SAMPLE_MENU_ITEMS)} menu items to the database!")
     db.close()
 
+SYNTHETIC_VARIANTS = ["Classic", "Spicy", "Double", "Mini", "Family", "Crispy", "Cheesy", "Smoky", "Zesty", "Grilled"]
+SYNTHETIC_DAYS = 365
+SYNTHETIC_BATCH = 20000
+SYNTHETIC_ACTIVE_HOURS = 1
+
+
+def tracking_code(n: int) -> str:
+    """Deterministic 6-character A-Z0-9 code for synthetic order n."""
+    chars = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    code = ""
+    for _ in range(6):
+        n, digit = divmod(n, 36)
+        code = chars[digit] + code
+    return code
+
+
+def seed_synthetic(engine, menu_items=10000, orders=1000000, seed=0):
+    """Fill an empty database with menu_items items and orders orders.
+
+    Items are variants of SAMPLE_MENU_ITEMS; each order has 1-3 lines and a
+    created_at within the last SYNTHETIC_DAYS days. Like a real kitchen, only
+    orders from the last SYNTHETIC_ACTIVE_HOURS are still active; older ones
+    are Completed or Cancelled. Counters and analytics rollups are rebuilt at
+    the end. The same seed gives the same data.
+    """
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    active_since = now - timedelta(hours=SYNTHETIC_ACTIVE_HOURS)
+
+    menu = []
+    for i in range(menu_items):
+        base = SAMPLE_MENU_ITEMS[i % len(SAMPLE_MENU_ITEMS)]
+        variant = SYNTHETIC_VARIANTS[(i // len(SAMPLE_MENU_ITEMS)) % len(SYNTHETIC_VARIANTS)]
+        menu.append({
+            "id": i + 1,
+            "item": f"{variant} {base['item']} {i + 1}",
+            "category": base["category"],
+            "price": round(base["price"] * rng.uniform(0.8, 1.5), 2),
+            "description": base["description"],
+        })
+
+    with engine.begin() as conn:
+        conn.execute(insert(models.Menu), menu)
+
+        for batch_start in range(0, orders, SYNTHETIC_BATCH):
+            order_rows, item_rows = [], []
+            for order_id in range(batch_start + 1, min(batch_start + SYNTHETIC_BATCH, orders) + 1):
+                total = 0.0
+                for _ in range(rng.randint(1, 3)):
+                    item = menu[rng.randrange(menu_items)]
+                    quantity = rng.randint(1, 4)
+                    total += item["price"] * quantity
+                    item_rows.append({
+                        "order_id": order_id, "item_id": item["id"],
+                        "quantity": quantity, "unit_price": item["price"],
+                    })
+                order_rows.append({
+                    "id": order_id,
+                    "tracking_code": tracking_code(order_id),
+                    "user_details": f"Customer {order_id}",
+                    "total_amount": round(total, 2),
+                    "created_at": now - timedelta(seconds=rng.randrange(SYNTHETIC_DAYS * 86400)),
+                })
+                if order_rows[-1]["created_at"] >= active_since:
+                    order_rows[-1]["order_status"] = rng.choice(["Pending", "Preparing", "Ready"])
+                else:
+                    order_rows[-1]["order_status"] = rng.choices(["Completed", "Cancelled"], [85, 15])[0]
+            conn.execute(insert(models.Order), order_rows)
+            conn.execute(insert(models.OrderItem), item_rows)
+
+        migrations.rebuild_order_status_counts(conn)
+        rollups.rebuild(conn)
+
+    with SessionLocal(bind=engine) as db:
+        for name in (versions.ORDERS, menu_cache.MENU_VERSION):
+            versions.bump_version(db, name)
+        db.commit()
+
+
 if __name__ == "__main__":
-    seed_menu()
+    parser = argparse.ArgumentParser(description="Seed the database (sample menu, or synthetic data at scale).")
+    parser.add_argument("--menu-items", type=int, help="synthetic menu items (requires an empty database)")
+    parser.add_argument("--orders", type=int, default=0, help="synthetic orders, with --menu-items")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # Create tables and apply pending migrations
+    migrations.upgrade()
+    if args.menu_items:
+        from backend.database import engine
+
+        seed_synthetic(engine, args.menu_items, args.orders, args.seed)
+        print(f"Seeded {args.menu_items} menu items and {args.orders} orders.")
+    else:
+        seed_menu()
@@ -1,6 +1,9 @@
 @echo off
 echo Starting Restaurant AI Chatbot...
 echo.
+echo Applying database migrations...
+python -m backend.migrations
+echo.
 echo Starting Backend Server...
 start "Backend Server" cmd /k "python run_backend.py"
 timeout /t 3 /nobreak > nul
@@ -0,0 +1,75 @@
+"""
+Serialization contract for FAST_JSON: every URL must return the same status,
+the same parsed JSON body and the same X-Next-Cursor as the default
+response_model path. Runs on a small throwaway synthetic database, from the
+project root:
+
+    python test_serialization_contract.py
+
+benchmarks.bench_serialization runs the same check before it times anything.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+URLS = [
+    "/menu/",
+    "/menu/?limit=5000",
+    "/categories",
+    "/orders/?limit=100",
+    "/orders/?limit=1000",
+    "/orders/?limit=100&fields=summary",
+    "/orders/?limit=100&status=Completed&created_from=2026-01-01T00:00:00",
+]
+
+
+async def fetch(client, url):
+    r = await client.get(url)
+    return r.status_code, r.json(), r.headers.get("x-next-cursor")
+
+
+async def mismatches(client, urls=URLS):
+    """URLs whose response differs between the default path and FAST_JSON."""
+    from backend import fast_json
+
+    enabled = fast_json.ENABLED
+    failed = []
+    try:
+        for url in urls:
+            fast_json.ENABLED = False
+            expected = await fetch(client, url)
+            fast_json.ENABLED = True
+            actual = await fetch(client, url)
+            if actual != expected:
+                failed.append(url)
+    finally:
+        fast_json.ENABLED = enabled
+    return failed
+
+
+async def run(args):
+    import httpx
+    from backend import main
+    from benchmarks.loadtest import prepare_database
+
+    prepare_database(args)
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://check") as client:
+        return await mismatches(client)
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # Must be set before the backend is imported.
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir, 'contract.db')}"
+        os.environ["LLM_PROVIDER"] = "stub"
+        failed = asyncio.run(run(SimpleNamespace(menu_items=200, orders=5000, seed=0)))
+        from backend.database import engine
+        engine.dispose()
+
+    for url in failed:
+        print(f"FAIL {url}")
+    print(f"{len(URLS) - len(failed)}/{len(URLS)} URLs return identical JSON")
+    sys.exit(1 if failed else 0)